@@ -7,20 +7,32 @@ https://github.com/ludeeus/acond
 
 from __future__ import annotations
 
+import shutil
 from datetime import timedelta
-from ipaddress import ip_address
+from functools import partial
 from typing import TYPE_CHECKING
 
 from homeassistant.const import CONF_IP_ADDRESS, CONF_PASSWORD, CONF_USERNAME, Platform
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
 from homeassistant.loader import async_get_loaded_integration
 
-from .api import AcondApiClient
+from .aconomis.api import AcondApiClient
 from .const import DOMAIN, LOGGER
-from .coordinator import AcondDataUpdateCoordinator
+from .coordinator import (
+    SCHEDULE_STORAGE_VERSION,
+    AcondDataUpdateCoordinator,
+    sample_store_path,
+    schedule_storage_key,
+)
 from .data import AcondData
+from .metrics import AcondMetricsView
+from .services import async_setup_services
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
 
     from .data import AcondConfigEntry
 
@@ -33,6 +45,15 @@ PLATFORMS: list[Platform] = [
 
 UPDATE_INTERVAL = timedelta(seconds=5)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:  # noqa: ARG001
+    """Set up the services and the metrics endpoint of this integration."""
+    async_setup_services(hass)
+    hass.http.register_view(AcondMetricsView())
+    return True
+
 
 # https://developers.home-assistant.io/docs/config_entries_index/#setting-up-an-entry
 async def async_setup_entry(
@@ -56,10 +77,26 @@ async def async_setup_entry(
         coordinator=coordinator,
     )
 
+    await coordinator.async_load_schedules()
+    if coordinator.samples is None:
+        # Samples stored before the store was turned off are not kept
+        await hass.async_add_executor_job(
+            partial(shutil.rmtree, sample_store_path(hass, entry), ignore_errors=True)
+        )
+
     # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
     await coordinator.async_config_entry_first_refresh()
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # Only poll the pages the enabled entities need
+    coordinator.async_update_wanted_registers()
+    entry.async_on_unload(
+        hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED,
+            coordinator.async_entity_registry_updated,
+        )
+    )
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
@@ -70,9 +107,28 @@ async def async_unload_entry(
     entry: AcondConfigEntry,
 ) -> bool:
     """Handle removal of an entry."""
+    client = entry.runtime_data.client
+    await client.async_stop_recording()
+    if (samples := entry.runtime_data.coordinator.samples) is not None:
+        await hass.async_add_executor_job(samples.close)
+    if client.memory_profiler is not None:
+        client.memory_profiler.stop()
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
 
+async def async_remove_entry(
+    hass: HomeAssistant,
+    entry: AcondConfigEntry,
+) -> None:
+    """Remove the setpoint schedules and the raw samples of a removed entry."""
+    await Store(
+        hass, SCHEDULE_STORAGE_VERSION, schedule_storage_key(entry)
+    ).async_remove()
+    await hass.async_add_executor_job(
+        partial(shutil.rmtree, sample_store_path(hass, entry), ignore_errors=True)
+    )
+
+
 async def async_reload_entry(
     hass: HomeAssistant,
     entry: AcondConfigEntry,
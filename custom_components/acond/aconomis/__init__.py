@@ -0,0 +1,9 @@
+"""
+Asyncio client for Acond Aconomis controllers.
+
+The client, its parser, request scheduling and the register mapping of the
+controller only need aiohttp, and BeautifulSoup for pages the byte-level
+parser cannot handle. Nothing in this package imports Home Assistant, so
+it can be used by the integration as well as on its own, with the
+directory containing it on the path.
+"""
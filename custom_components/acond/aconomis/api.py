@@ -0,0 +1,691 @@
+"""Acond API Client."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import socket
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+
+from .const import ACOND_ACONOMIS_DATA_MAPPINGS, LOGGER, AcondRegulationMode
+from .equitherm import EQUITHERM_REFRESH_INTERVAL, AcondEquithermCurve
+from .latency import AcondLatencyEstimator
+from .parser import PageLayout, detect_encoding, extract_inputs
+from .profiling import STAGE_DECODE, STAGE_FETCH, STAGE_MERGE, STAGE_PARSE
+from .registers import AcondRegisterCatalog
+from .scheduler import AcondRequestPriority, AcondRequestScheduler
+from .trace import AcondPollTracer
+
+if TYPE_CHECKING:
+    from contextlib import AbstractContextManager
+
+    from .profiling import AcondMemoryProfiler
+    from .recording import AcondSessionRecorder
+
+PAGE_LOGIN = "SYSWWW/LOGIN.XML"
+PAGE_MEASUREMENT = "PAGE214.XML"
+PAGE_CONTROL = "PAGE206.XML"
+PAGE_SETTINGS = "PAGE207.XML"
+PAGE_EQUITHERM = "PAGE225.XML"
+
+HTTP_FOUND = 302
+
+# Pages merged into every poll, later pages take precedence on duplicate registers
+POLL_PAGES = (PAGE_SETTINGS, PAGE_MEASUREMENT, PAGE_CONTROL, PAGE_EQUITHERM)
+# Pages that rarely change are refreshed on their own, slower schedule (in seconds)
+PAGE_REFRESH_INTERVALS = {
+    PAGE_SETTINGS: 300.0,
+}
+
+# Pages larger than this (in bytes) are parsed in an executor thread
+PARSE_OFFLOAD_SIZE = 16 * 1024
+# Pages whose recent average parse time exceeds this (in seconds) are offloaded
+PARSE_OFFLOAD_TIME = 0.005
+PARSE_HISTORY_SIZE = 10
+
+
+class AcondApiClientError(Exception):
+    """Exception to indicate a general API error."""
+
+
+class AcondApiClientCommunicationError(
+    AcondApiClientError,
+):
+    """Exception to indicate a communication error."""
+
+
+class AcondApiClientAuthenticationError(
+    AcondApiClientError,
+):
+    """Exception to indicate an authentication error."""
+
+
+def _verify_response_or_raise(response: aiohttp.ClientResponse) -> None:
+    """Verify that the response is valid."""
+    if response.status in (401, 403):
+        msg = "Invalid credentials"
+        raise AcondApiClientAuthenticationError(
+            msg,
+        )
+    try:
+        response.raise_for_status()
+    except aiohttp.ClientResponseError as exception:
+        msg = f"Error response from the device - {exception}"
+        raise AcondApiClientCommunicationError(
+            msg,
+        ) from exception
+
+
+def _soup_inputs(str_response: str) -> list[tuple[str, str]]:
+    """Extract the NAME and VALUE attributes of all INPUT elements with a parser."""
+    # Only needed as a fallback, the client does not require it otherwise
+    from bs4 import BeautifulSoup  # noqa: PLC0415
+
+    soup = BeautifulSoup(str_response, "lxml-xml")
+    inputs = []
+
+    for elem in soup.find_all("INPUT"):
+        name = str(elem.get("NAME"))
+        value = str(elem.get("VALUE"))
+
+        if name is None or value is None:
+            LOGGER.warning("Input tag found without name or value: %s", elem)
+            continue
+
+        inputs.append((name, value))
+
+    return inputs
+
+
+def _extract_page(
+    page: str, body: bytes, encoding: str, layout: PageLayout | None
+) -> tuple[list[tuple[str, str]], PageLayout | None]:
+    """
+    Extract the inputs of a page, with the layout to keep for it.
+
+    Only its arguments are used, so it is safe to run in an executor while
+    the event loop uses the client.
+    """
+    if layout is not None:
+        if (inputs := layout.extract(body, encoding)) is not None:
+            return inputs, layout
+
+        LOGGER.info("Layout of %s changed, falling back to a full parse", page)
+
+    inputs = extract_inputs(body, encoding)
+    layout = PageLayout.learn(body, encoding)
+
+    if not inputs and b"<INPUT" in body:
+        LOGGER.debug("No inputs extracted from %s, falling back to full parse", page)
+        inputs = _soup_inputs(body.decode(encoding, "replace"))
+
+    return inputs, layout
+
+
+def _timed_extract_page(
+    page: str, body: bytes, encoding: str, layout: PageLayout | None
+) -> tuple[list[tuple[str, str]], PageLayout | None, float]:
+    """Extract the inputs of a page and return them with the time it took."""
+    start = time.perf_counter()
+    inputs, layout = _extract_page(page, body, encoding, layout)
+    return inputs, layout, time.perf_counter() - start
+
+
+@dataclass
+class AcondParseStats:
+    """Parse timing statistics for a single page."""
+
+    parses: int = 0
+    offloaded: int = 0
+    loop_time: float = 0.0
+    loop_time_max: float = 0.0
+    executor_time: float = 0.0
+    # Size of the latest body in bytes
+    size: int = 0
+    history: deque[float] = field(
+        default_factory=lambda: deque(maxlen=PARSE_HISTORY_SIZE)
+    )
+
+    @property
+    def average(self) -> float:
+        """Return the average of the recent parse durations."""
+        return sum(self.history) / len(self.history) if self.history else 0.0
+
+    def record(self, duration: float, size: int, *, offloaded: bool) -> None:
+        """Record a parse duration and the size of the parsed body."""
+        self.parses += 1
+        self.size = size
+        self.history.append(duration)
+
+        if offloaded:
+            self.offloaded += 1
+            self.executor_time += duration
+        else:
+            self.loop_time += duration
+            self.loop_time_max = max(self.loop_time_max, duration)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics as a dictionary."""
+        return {
+            "parses": self.parses,
+            "offloaded": self.offloaded,
+            "loop_time": self.loop_time,
+            "loop_time_max": self.loop_time_max,
+            "executor_time": self.executor_time,
+            "size": self.size,
+            "average": self.average,
+        }
+
+
+class AcondApiClient:
+    """Sample API Client."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        ip_address: str,
+        username: str,
+        password: str,
+        parse_offload_size: int = PARSE_OFFLOAD_SIZE,
+        parse_offload_time: float = PARSE_OFFLOAD_TIME,
+        session: aiohttp.ClientSession | None = None,
+        scheduler: AcondRequestScheduler | None = None,
+        latency: AcondLatencyEstimator | None = None,
+    ) -> None:
+        """Sample API Client."""
+        self._ip_address = ip_address
+        self._username = username
+        self._password = password
+
+        self._parse_offload_size = parse_offload_size
+        self._parse_offload_time = parse_offload_time
+        self._parse_stats: dict[str, AcondParseStats] = {}
+        self._page_encodings: dict[str, str] = {}
+        self._page_layouts: dict[str, PageLayout] = {}
+        self._register_catalog = AcondRegisterCatalog()
+        self._scheduler = scheduler or AcondRequestScheduler()
+        self._latency = latency or AcondLatencyEstimator()
+        self._tracer = AcondPollTracer()
+        self._readback_pending = False
+        self._equitherm_curve = AcondEquithermCurve()
+        self._page_cache: dict[str, dict[str, Any]] = {}
+        self._page_fetched: dict[str, float] = {}
+        self._page_registers: dict[str, frozenset[str]] = {}
+        # Registers that are needed, None if all of them are
+        self.wanted_registers: frozenset[str] | None = None
+        self._recorder: AcondSessionRecorder | None = None
+        self.memory_profiler: AcondMemoryProfiler | None = None
+
+        if session is not None:
+            self._session = session
+            return
+
+        self._connector = aiohttp.TCPConnector(family=socket.AF_INET)
+        self._cookie_jar = aiohttp.CookieJar(unsafe=True)
+        self._session = aiohttp.ClientSession(
+            connector=self._connector,
+            cookie_jar=self._cookie_jar,
+        )
+
+    async def async_get_all(self) -> Any:
+        """Get data from the API."""
+        # The first poll after a write reads back its result
+        priority = (
+            AcondRequestPriority.READBACK
+            if self._readback_pending
+            else AcondRequestPriority.POLL
+        )
+        self._readback_pending = False
+
+        merged: dict[str, Any] = {}
+        with self._tracer.cycle() as cycle:
+            for page in self._wanted_pages():
+                if page == PAGE_EQUITHERM:
+                    result = await self._async_get_equitherm_page(merged, priority)
+                else:
+                    result = await self._async_get_scheduled_page(page, priority)
+                if isinstance(result, dict):
+                    with self._profile(STAGE_MERGE):
+                        merged.update(result)
+
+            self._tracer.changes(cycle, merged)
+
+        return merged
+
+    def _wanted_pages(self) -> list[str]:
+        """
+        Return the pages to poll, leaving out pages without wanted registers.
+
+        Pages are only left out once it is known which registers they hold,
+        and only as long as all wanted registers were seen on some page.
+        """
+        wanted = self.wanted_registers
+        if wanted is None or len(self._page_registers) < len(POLL_PAGES):
+            return list(POLL_PAGES)
+        if not wanted <= frozenset().union(*self._page_registers.values()):
+            return list(POLL_PAGES)
+
+        return [
+            page
+            for page in POLL_PAGES
+            if not self._page_registers[page].isdisjoint(wanted)
+        ]
+
+    @property
+    def skipped_pages(self) -> list[str]:
+        """Return the pages that are currently left out of the poll."""
+        return [page for page in POLL_PAGES if page not in self._wanted_pages()]
+
+    def _profile(self, stage: str) -> AbstractContextManager[None]:
+        """Record the allocations of a stage when memory profiling is enabled."""
+        if self.memory_profiler is None:
+            return contextlib.nullcontext()
+        return self.memory_profiler.stage(stage)
+
+    async def _async_get_equitherm_page(
+        self, merged: dict[str, Any], priority: AcondRequestPriority
+    ) -> Any:
+        """
+        Get the equitherm page, or compute its target from the local curve.
+
+        In equitherm regulation the target only depends on the average outdoor
+        temperature, so the page is only fetched to learn the curve, when the
+        outdoor temperature is outside of it and for periodic drift checks.
+        Only the target is computed, the page is fetched on every poll while
+        other registers on it are wanted.
+        """
+        target_key = ACOND_ACONOMIS_DATA_MAPPINGS[
+            "EQUITHERM_TARGET_RETURN_WATER_TEMPERATURE"
+        ]
+        cached = self._page_cache.get(PAGE_EQUITHERM)
+        known = {**(cached or {}), **merged}
+        outdoor = known.get(ACOND_ACONOMIS_DATA_MAPPINGS["OUTDOOR_TEMPERATURE_AVERAGE"])
+        equitherm = known.get(
+            ACOND_ACONOMIS_DATA_MAPPINGS["REGULATION_MODE"]
+        ) == AcondRegulationMode.EQUITHERM and isinstance(outdoor, float)
+
+        wanted = self.wanted_registers
+        only_target = wanted is not None and wanted.isdisjoint(
+            self._page_registers.get(PAGE_EQUITHERM, frozenset()) - {target_key}
+        )
+
+        now = time.monotonic()
+        fetched = self._page_fetched.get(PAGE_EQUITHERM)
+        if (
+            equitherm
+            and only_target
+            and fetched is not None
+            and now - fetched < EQUITHERM_REFRESH_INTERVAL
+            and (target := self._equitherm_curve.predict(outdoor)) is not None
+        ):
+            return {target_key: target}
+
+        result = await self._async_get_page(PAGE_EQUITHERM, priority)
+        self._page_cache[PAGE_EQUITHERM] = result
+        self._page_fetched[PAGE_EQUITHERM] = now
+
+        target = result.get(target_key)
+        if (
+            equitherm
+            and isinstance(target, float)
+            and not self._equitherm_curve.add_sample(outdoor, target)
+        ):
+            LOGGER.info("Equitherm curve changed on the device, learning it again")
+
+        return result
+
+    async def _async_get_scheduled_page(
+        self, page: str, priority: AcondRequestPriority
+    ) -> Any:
+        """Get a page, or its cached result if it is not due for a refresh yet."""
+        interval = PAGE_REFRESH_INTERVALS.get(page)
+        if interval is None:
+            return await self._async_get_page(page, priority)
+
+        now = time.monotonic()
+        fetched = self._page_fetched.get(page)
+        if fetched is not None and now - fetched < interval:
+            return self._page_cache.get(page)
+
+        # Slow pages must not hold up the regular poll when they fail
+        self._page_fetched[page] = now
+        try:
+            self._page_cache[page] = await self._async_get_page(page, priority)
+        except AcondApiClientCommunicationError as exception:
+            LOGGER.warning("Failed to refresh %s: %s", page, exception)
+
+        return self._page_cache.get(page)
+
+    @property
+    def register_catalog(self) -> AcondRegisterCatalog:
+        """Return the catalog of registers seen on the device."""
+        return self._register_catalog
+
+    @property
+    def equitherm_curve(self) -> AcondEquithermCurve:
+        """Return the locally learned equitherm curve."""
+        return self._equitherm_curve
+
+    @property
+    def recorder(self) -> AcondSessionRecorder | None:
+        """Return the active session recorder, if any."""
+        return self._recorder
+
+    def start_recording(self, recorder: AcondSessionRecorder) -> None:
+        """Start recording all exchanges with the device."""
+        self._recorder = recorder
+
+    async def async_stop_recording(self) -> AcondSessionRecorder | None:
+        """Stop recording and write the remaining exchanges."""
+        recorder, self._recorder = self._recorder, None
+        if recorder is not None:
+            await recorder.async_flush()
+        return recorder
+
+    @property
+    def scheduler(self) -> AcondRequestScheduler:
+        """Return the request scheduler of the device."""
+        return self._scheduler
+
+    @property
+    def latency(self) -> AcondLatencyEstimator:
+        """Return the latency estimator that sets the request timeouts."""
+        return self._latency
+
+    @property
+    def tracer(self) -> AcondPollTracer:
+        """Return the trace of the recent poll cycles."""
+        return self._tracer
+
+    @property
+    def parse_stats(self) -> dict[str, AcondParseStats]:
+        """Return parse timing statistics per page."""
+        return self._parse_stats
+
+    async def async_get_measurements(self) -> Any:
+        """Get data from the API."""
+        return await self._async_get_page(PAGE_MEASUREMENT)
+
+    async def async_get_controls(self) -> Any:
+        """Get data from the API."""
+        return await self._async_get_page(PAGE_CONTROL)
+
+    async def async_get_settings(self) -> Any:
+        """Get data from the API."""
+        return await self._async_get_page(PAGE_SETTINGS)
+
+    async def async_get_equitherm(self) -> Any:
+        """Get data from the API."""
+        return await self._async_get_page(PAGE_EQUITHERM)
+
+    async def login(
+        self, priority: AcondRequestPriority = AcondRequestPriority.INTERACTIVE
+    ) -> Any:
+        """Login to the API."""
+        data = aiohttp.FormData()
+        data.add_field("USER", self._username)
+        data.add_field("PASS", self._password)
+
+        login_response = await self._api_wrapper(
+            method="post",
+            url=f"http://{self._ip_address}/{PAGE_LOGIN}",
+            data=data,
+            priority=priority,
+        )
+
+        if login_response.status != HTTP_FOUND:
+            raise AcondApiClientAuthenticationError("Login failed")
+
+    async def async_set_dhw_temperature(self, temperature: float) -> None:
+        """Set new target temperature for domestic hot water."""
+        set_temperature_key = ACOND_ACONOMIS_DATA_MAPPINGS[
+            "SET_DHW_TEMPERATURE_REQUIRED"
+        ]
+
+        data = aiohttp.FormData()
+        data.add_field(f"{set_temperature_key}={temperature:.1f}", "")
+
+        response = await self._api_wrapper_retry_unauthenticated(
+            method="post",
+            url=f"http://{self._ip_address}/{PAGE_CONTROL}",
+            data=data,
+            priority=AcondRequestPriority.INTERACTIVE,
+        )
+
+        _verify_response_or_raise(response)
+        self._readback_pending = True
+
+    async def async_set_heating_temperature(self, temperature: float) -> None:
+        """Set new target temperature for heating."""
+        set_temperature_key = ACOND_ACONOMIS_DATA_MAPPINGS[
+            "SET_HEATING_TEMPERATURE_REQUIRED"
+        ]
+
+        data = aiohttp.FormData()
+        data.add_field(f"{set_temperature_key}={temperature:.1f}", "")
+
+        response = await self._api_wrapper_retry_unauthenticated(
+            method="post",
+            url=f"http://{self._ip_address}/{PAGE_CONTROL}",
+            data=data,
+            priority=AcondRequestPriority.INTERACTIVE,
+        )
+
+        _verify_response_or_raise(response)
+        self._readback_pending = True
+
+    async def async_set_cooling_temperature(self, temperature: float) -> None:
+        """Set new target temperature for cooling."""
+        set_temperature_key = ACOND_ACONOMIS_DATA_MAPPINGS[
+            "SET_COOLING_TEMPERATURE_REQUIRED"
+        ]
+
+        data = aiohttp.FormData()
+        data.add_field(f"{set_temperature_key}={temperature:.1f}", "")
+
+        response = await self._api_wrapper_retry_unauthenticated(
+            method="post",
+            url=f"http://{self._ip_address}/{PAGE_CONTROL}",
+            data=data,
+            priority=AcondRequestPriority.INTERACTIVE,
+        )
+
+        _verify_response_or_raise(response)
+        self._readback_pending = True
+
+    async def _async_get_page(
+        self,
+        page: str,
+        priority: AcondRequestPriority = AcondRequestPriority.POLL,
+    ) -> Any:
+        """Get a page from the API."""
+        with self._profile(STAGE_FETCH):
+            response = await self._api_wrapper_retry_unauthenticated(
+                method="get",
+                url=f"http://{self._ip_address}/{page}",
+                priority=priority,
+            )
+
+            LOGGER.debug("async_get_page response: %s", response)
+
+            body = await response.read()
+
+        if page not in self._page_encodings:
+            with self._profile(STAGE_DECODE):
+                self._page_encodings[page] = detect_encoding(body, response.charset)
+
+        with self._profile(STAGE_PARSE):
+            result = await self._async_map_page(page, body)
+
+        if isinstance(result, dict):
+            self._page_registers[page] = frozenset(result)
+        return result
+
+    async def _async_map_page(self, page: str, body: bytes) -> Any:
+        """Map a page response, offloading large or slow pages to an executor."""
+        stats = self._parse_stats.setdefault(page, AcondParseStats())
+        offload = (
+            len(body) >= self._parse_offload_size
+            or stats.average >= self._parse_offload_time
+        )
+
+        # Only the extraction is offloaded, the register catalog and the layouts
+        # are shared with the event loop and only ever changed on it
+        encoding = self._page_encodings.get(page) or detect_encoding(body)
+        layout = self._page_layouts.get(page)
+        if offload:
+            loop = asyncio.get_running_loop()
+            inputs, layout, duration = await loop.run_in_executor(
+                None, _timed_extract_page, page, body, encoding, layout
+            )
+        else:
+            inputs, layout, duration = _timed_extract_page(page, body, encoding, layout)
+
+        start = time.perf_counter()
+        result = self._decode_inputs(page, inputs, layout)
+        duration += time.perf_counter() - start
+
+        stats.record(duration, len(body), offloaded=offload)
+        self._tracer.parsed(page, duration)
+        LOGGER.debug(
+            "Parsed %s in %.1f ms (%s)",
+            page,
+            duration * 1000,
+            "executor" if offload else "event loop",
+        )
+
+        return result
+
+    def _decode_page(self, page: str, body: bytes) -> Any:
+        """Decode a page from its raw bytes."""
+        encoding = self._page_encodings.get(page) or detect_encoding(body)
+        inputs, layout = _extract_page(
+            page, body, encoding, self._page_layouts.get(page)
+        )
+        return self._decode_inputs(page, inputs, layout)
+
+    def _decode_inputs(
+        self, page: str, inputs: list[tuple[str, str]], layout: PageLayout | None
+    ) -> dict[str, Any]:
+        """Decode the inputs of a page and keep the layout learned for it."""
+        if layout is None:
+            self._page_layouts.pop(page, None)
+        else:
+            self._page_layouts[page] = layout
+        return self._register_catalog.decode_inputs(inputs)
+
+    async def _api_wrapper_retry_unauthenticated(  # noqa: PLR0913
+        self,
+        method: str,
+        url: str,
+        data: aiohttp.FormData | None = None,
+        headers: dict | None = None,
+        attempt: int = 0,
+        priority: AcondRequestPriority = AcondRequestPriority.POLL,
+    ) -> aiohttp.ClientResponse:
+        """Send an API request and retries exactly once if it fails with an authentication error."""  # noqa: E501
+        response = await self._api_wrapper(
+            method=method,
+            url=url,
+            data=data,
+            headers=headers,
+            priority=priority,
+        )
+
+        if (
+            response.status == HTTP_FOUND
+            and response.headers.get("Location") == f"/{PAGE_LOGIN}"
+        ):
+            if attempt == 0:
+                self._tracer.relogin()
+                await self.login(priority)
+                return await self._api_wrapper_retry_unauthenticated(
+                    method=method,
+                    url=url,
+                    data=data,
+                    headers=headers,
+                    attempt=attempt + 1,
+                    priority=priority,
+                )
+
+            raise AcondApiClientAuthenticationError("Login failed after retry")
+
+        return response
+
+    async def _api_wrapper(  # noqa: PLR0913
+        self,
+        method: str,
+        url: str,
+        data: aiohttp.FormData | None = None,
+        headers: dict | None = None,
+        priority: AcondRequestPriority = AcondRequestPriority.POLL,
+    ) -> aiohttp.ClientResponse:
+        """Get information from the API."""
+        page = url.removeprefix(f"http://{self._ip_address}/")
+        latency_key = f"{method.upper()} {page}"
+        timeout = self._latency.timeout(latency_key)
+        trace = self._tracer.request(method, page, timeout)
+        try:
+            async with self._scheduler.slot(priority), asyncio.timeout(timeout):
+                start = time.monotonic()
+                response = await self._session.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    data=data,
+                    allow_redirects=False,
+                )
+                # Consume the body while holding the slot, it is cached on the
+                # response
+                body = await response.read()
+                trace.size = len(body)
+
+                if self._recorder is not None:
+                    self._recorder.record(
+                        method=method,
+                        page=page,
+                        status=response.status,
+                        location=response.headers.get("Location"),
+                        charset=response.charset,
+                        elapsed=time.monotonic() - start,
+                        body=body,
+                    )
+
+                elapsed = time.monotonic() - start
+                self._latency.record(latency_key, elapsed)
+                trace.status = response.status
+                trace.elapsed = elapsed
+                return response
+
+        except TimeoutError as exception:
+            self._latency.record_timeout(latency_key)
+            msg = f"Timeout error fetching information after {timeout:.2f} s"
+            trace.error = msg
+            raise AcondApiClientCommunicationError(
+                msg,
+            ) from exception
+        except (aiohttp.ClientError, socket.gaierror) as exception:
+            msg = f"Error fetching information - {exception}"
+            trace.error = msg
+            raise AcondApiClientCommunicationError(
+                msg,
+            ) from exception
+        except Exception as exception:  # pylint: disable=broad-except
+            msg = f"Something really wrong happened! - {exception}"
+            trace.error = msg
+            raise AcondApiClientError(
+                msg,
+            ) from exception
+
+    def _map_response(self, str_response: str) -> Any:
+        """Map response."""
+        return self._register_catalog.decode_inputs(_soup_inputs(str_response))
+
+    async def close(self) -> None:
+        """Close the session."""
+        await self.async_stop_recording()
+        await self._session.close()
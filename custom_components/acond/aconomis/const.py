@@ -0,0 +1,98 @@
+"""Constants of the Acond Aconomis controller."""
+
+from logging import Logger, getLogger
+from typing import ClassVar
+
+LOGGER: Logger = getLogger(__package__)
+
+
+class AcondSeasonMode:
+    """Operating modes for Acond Aconomis."""
+
+    SUMMER = "SUMMER"
+    WINTER = "WINTER"
+
+
+class AcondRegulationMode:
+    """Operating modes for Acond Aconomis."""
+
+    MANUALLY = "MANUALLY"
+    EQUITHERM = "EQUITHERM"
+
+
+class AcondOperatingMode:
+    """Operating modes for Acond Aconomis."""
+
+    OFF = "OFF"
+    AUTO = "AUTO"
+    HEATPUMP = "HEATPUMP"
+    BIVALENCE = "BIVALENCE"
+    COOLING = "COOLING"
+
+    VALUE_TO_MODE: ClassVar[dict[int, str]] = {
+        0: AUTO,
+        1: HEATPUMP,
+        3: BIVALENCE,
+        4: OFF,
+        6: COOLING,
+    }
+
+    MODE_TO_VALUE: ClassVar[dict[str, int]] = {
+        value: key for key, value in VALUE_TO_MODE.items()
+    }
+
+    @classmethod
+    def from_value(cls, value: int | None) -> str | None:
+        """Return the operating mode string for an API integer value."""
+        if value is None:
+            return None
+        return cls.VALUE_TO_MODE.get(value)
+
+    @classmethod
+    def to_value(cls, mode: str) -> int | None:
+        """Return the API integer value for a given operating mode string."""
+        return cls.MODE_TO_VALUE.get(mode)
+
+
+ACOND_ACONOMIS_DATA_MAPPINGS = {
+    # Modes
+    "REGULATION_MODE": "__TA9A7CFD0_STRING[10]_s",
+    "MANUAL_TARGET_RETURN_WATER_TEMPERATURE": "__T61D2108E_REAL_.1f",
+    "MANUAL_TARGET_RETURN_WATER_COOLING_TEMPERATURE": "__T37A38FFF_REAL_.1f",
+    "EQUITHERM_TARGET_RETURN_WATER_TEMPERATURE": "__TB1292215_REAL_.1f",
+    "OPERATING_MODE": "__TE87976A3_USINT_u",
+    "SEASON_MODE": "__TE4A78682_BOOL_i",
+    # State
+    "COMPRESSOR_ACTIVE": "__T61E4AC91_BOOL_i",
+    "FAN_ACTIVE": "__TF4B3F468_BOOL_i",
+    "PRIMARY_CIRCUIT_PUMP_ACTIVE": "__T2BA2EA36_BOOL_i",
+    "SECONDARY_CIRCUIT_PUMP_ACTIVE": "__T6F64FA70_BOOL_i",
+    "DEFROST_ACTIVE": "__T880DC46F_BOOL_i",
+    "BIVALENCE_ACTIVE": "__TD3998BF7_BOOL_i",
+    "DHW_ACTIVE": "__T80F610D7_BOOL_i",
+    # Power
+    "ENERGY_CONSUMPTION": "__T7CC39460_REAL_.0f",
+    "ENERGY_CONSUMPTION_TODAY": "__T95EA3F43_REAL_.2f",
+    "POWER_CONSUMPTION": "__TEA3C3623_REAL_.2f",
+    # Heat
+    "HEAT_QUANTITY": "__T6C18EDAA_REAL_.0f",
+    "HEAT_QUANTITY_TODAY": "__TDAE695C6_REAL_.2f",
+    "HEAT_PRODUCTION": "__T8E9C4A5B_REAL_.2f",
+    # COP / SCOP
+    "COP": "__T0E9A681D_REAL_.2f",
+    "SCOP": "__T465DEE3C_REAL_.2f",
+    # Temperatures
+    "DHW_TEMPERATURE": "__T881A25AA_REAL_.1f",
+    "DHW_TEMPERATURE_REQUIRED": "__T1E34E7DC_REAL_.1f",
+    "SET_DHW_TEMPERATURE_REQUIRED": "__T3B27E86E_REAL_.1f",
+    "SET_HEATING_TEMPERATURE_REQUIRED": "__T61D2108E_REAL_.1f",
+    "SET_COOLING_TEMPERATURE_REQUIRED": "__T37A38FFF_REAL_.1f",
+    "OUTLET_TEMPERATURE": "__T9E13248E_REAL_.1f",
+    "ELECTRIC_HEATER_OUTLET_TEMPERATURE": "__T9D96D36A_REAL_.1f",
+    "INLET_TEMPERATURE": "__T50A32455_REAL_.1f",
+    "OUTDOOR_TEMPERATURE": "__T033A2538_REAL_.1f",
+    "OUTDOOR_TEMPERATURE_AVERAGE": "__TDE3BFC02_REAL_.1f",
+    # Network and device info
+    "MAC_ADDRESS": "__T1391DD99_STRING[17]_s",
+    "SOFTWARE_VERSION": "__T33B9D60A_STRING[80]_s",
+}
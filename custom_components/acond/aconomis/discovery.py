@@ -0,0 +1,101 @@
+"""Discovery of Acond Aconomis controllers on the local network."""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+from dataclasses import dataclass
+from ipaddress import IPv4Network, ip_network
+
+import aiohttp
+
+from .api import PAGE_LOGIN
+from .const import ACOND_ACONOMIS_DATA_MAPPINGS
+from .parser import detect_encoding, extract_inputs
+
+DISCOVERY_PORT = 80
+# Controllers answer the login page well within this on a LAN
+DISCOVERY_TIMEOUT = 1.5
+DISCOVERY_PARALLELISM = 128
+# Largest network that is scanned, a /22
+DISCOVERY_MAX_HOSTS = 1024
+
+# The login form posts these fields
+_LOGIN_FIELDS = frozenset(("USER", "PASS"))
+
+
+@dataclass(frozen=True, slots=True)
+class AcondDiscoveredController:
+    """A controller that answered with the Aconomis login page."""
+
+    host: str
+    mac_address: str | None
+    software_version: str | None
+
+
+async def async_probe(
+    session: aiohttp.ClientSession,
+    host: str,
+    timeout: float = DISCOVERY_TIMEOUT,  # noqa: ASYNC109
+) -> AcondDiscoveredController | None:
+    """Return the controller at the host, or None if there is none."""
+    try:
+        async with asyncio.timeout(timeout):
+            response = await session.get(
+                f"http://{host}/{PAGE_LOGIN}", allow_redirects=False
+            )
+            body = await response.read()
+    except (TimeoutError, aiohttp.ClientError, OSError):
+        return None
+
+    if response.status != 200:  # noqa: PLR2004
+        return None
+
+    inputs = dict(extract_inputs(body, detect_encoding(body, response.charset)))
+    if not inputs.keys() >= _LOGIN_FIELDS:
+        return None
+
+    return AcondDiscoveredController(
+        host=host,
+        mac_address=inputs.get(ACOND_ACONOMIS_DATA_MAPPINGS["MAC_ADDRESS"]),
+        software_version=inputs.get(ACOND_ACONOMIS_DATA_MAPPINGS["SOFTWARE_VERSION"]),
+    )
+
+
+async def async_discover(
+    network: str | IPv4Network,
+    port: int = DISCOVERY_PORT,
+    timeout: float = DISCOVERY_TIMEOUT,  # noqa: ASYNC109
+    parallelism: int = DISCOVERY_PARALLELISM,
+) -> list[AcondDiscoveredController]:
+    """
+    Probe every host of a network for a controller, concurrently.
+
+    Hosts that do not answer cost the timeout, so scanning a /24 takes
+    about two timeouts with the default parallelism.
+    """
+    network = ip_network(network, strict=False)
+    if (
+        not isinstance(network, IPv4Network)
+        or network.num_addresses > DISCOVERY_MAX_HOSTS
+    ):
+        msg = f"Only IPv4 networks up to {DISCOVERY_MAX_HOSTS} addresses are scanned"
+        raise ValueError(msg)
+
+    suffix = "" if port == DISCOVERY_PORT else f":{port}"
+    # The timeout of a probe only starts once it may connect
+    semaphore = asyncio.Semaphore(parallelism)
+
+    async def probe(host: str) -> AcondDiscoveredController | None:
+        async with semaphore:
+            return await async_probe(session, host, timeout)
+
+    connector = aiohttp.TCPConnector(
+        family=socket.AF_INET, limit=parallelism, force_close=True
+    )
+    async with aiohttp.ClientSession(connector=connector) as session:
+        results = await asyncio.gather(
+            *(probe(f"{address}{suffix}") for address in network.hosts())
+        )
+
+    return [result for result in results if result is not None]
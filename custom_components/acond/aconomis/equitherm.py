@@ -0,0 +1,109 @@
+"""Local model of the Acond equitherm heating curve."""
+
+from __future__ import annotations
+
+import bisect
+from typing import Any
+
+# Resolution of the outdoor temperature reported by the device (in °C)
+EQUITHERM_RESOLUTION = 0.1
+# Largest difference between the model and the device before the curve is
+# considered changed (in °C)
+EQUITHERM_TOLERANCE = 0.5
+# Largest distance between two points the curve is interpolated across, and
+# around a changed value the points are learned again in (in °C)
+EQUITHERM_MAX_GAP = 2.0
+# Full refresh interval of the equitherm page while the model is used (in seconds)
+EQUITHERM_REFRESH_INTERVAL = 300.0
+
+
+class AcondEquithermCurve:
+    """
+    Heating curve learned from the target values reported by the device.
+
+    In equitherm regulation the target return water temperature only depends
+    on the average outdoor temperature. The curve is recorded as points of
+    (outdoor temperature, target temperature) taken from full refreshes of
+    the equitherm page and linearly interpolated between points at most
+    EQUITHERM_MAX_GAP apart. Other outdoor temperatures are not predicted, so
+    the device is asked instead and the curve grows. When the device
+    disagrees with the curve, the points around that outdoor temperature are
+    dropped and learned again. A curve that is not linear between its
+    points, or that is clamped, then only loses the points near the
+    difference. Points elsewhere are checked again when the device is asked.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the curve."""
+        self._outdoor: list[float] = []
+        self._target: list[float] = []
+        self.samples = 0
+        self.drifts = 0
+
+    @property
+    def points(self) -> list[tuple[float, float]]:
+        """Return the points of the curve."""
+        return list(zip(self._outdoor, self._target, strict=True))
+
+    def predict(self, outdoor: float) -> float | None:
+        """Predict the target temperature, or None if outside of the curve."""
+        index = self._index(outdoor)
+
+        if self._matches(index, outdoor):
+            return self._target[index]
+        if index in (0, len(self._outdoor)):
+            return None
+
+        low, high = self._outdoor[index - 1], self._outdoor[index]
+        if high - low > EQUITHERM_MAX_GAP:
+            return None
+        ratio = (outdoor - low) / (high - low)
+        target = self._target[index - 1] + ratio * (
+            self._target[index] - self._target[index - 1]
+        )
+        return round(target, 1)
+
+    def add_sample(self, outdoor: float, target: float) -> bool:
+        """Add a value reported by the device, return False if the curve drifted."""
+        self.samples += 1
+        predicted = self.predict(outdoor)
+        drifted = (
+            predicted is not None and abs(predicted - target) > EQUITHERM_TOLERANCE
+        )
+
+        if drifted:
+            self.drifts += 1
+            start = bisect.bisect_left(self._outdoor, outdoor - EQUITHERM_MAX_GAP)
+            end = bisect.bisect_right(self._outdoor, outdoor + EQUITHERM_MAX_GAP)
+            del self._outdoor[start:end]
+            del self._target[start:end]
+
+        # A newer sample for the same outdoor temperature replaces the older one
+        index = self._index(outdoor)
+        if self._matches(index, outdoor):
+            self._outdoor[index] = outdoor
+            self._target[index] = target
+        else:
+            self._outdoor.insert(index, outdoor)
+            self._target.insert(index, target)
+
+        return not drifted
+
+    def _index(self, outdoor: float) -> int:
+        """Return the index of the first point not below the outdoor temperature."""
+        return bisect.bisect_left(self._outdoor, outdoor - EQUITHERM_RESOLUTION / 2)
+
+    def _matches(self, index: int, outdoor: float) -> bool:
+        """Return whether the point at the index is for the outdoor temperature."""
+        return (
+            index < len(self._outdoor)
+            and abs(self._outdoor[index] - outdoor) < EQUITHERM_RESOLUTION / 2
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the curve as a dictionary."""
+        return {
+            "points": self.points,
+            "samples": self.samples,
+            "drifts": self.drifts,
+        }
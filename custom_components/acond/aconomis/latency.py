@@ -0,0 +1,92 @@
+"""Request timeouts learned from the latency of a device."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+# Bounds of the timeouts, in seconds. Requests to pages without samples
+# yet use the ceiling, which was the fixed timeout before.
+DEFAULT_TIMEOUT_FLOOR = 0.5
+DEFAULT_TIMEOUT_CEILING = 10.0
+
+# Gains and variance factor of the estimators, as in RFC 6298
+RTT_ALPHA = 1 / 8
+RTT_BETA = 1 / 4
+RTT_K = 4
+
+
+@dataclass
+class AcondLatencyEstimate:
+    """Smoothed round trip time and its variation for a page."""
+
+    srtt: float
+    rttvar: float
+    samples: int = 1
+    timeouts: int = 0
+    # Doubled on every timeout, reset by the next sample
+    backoff: int = 1
+
+    def update(self, rtt: float) -> None:
+        """Add a round trip time sample."""
+        self.rttvar = (1 - RTT_BETA) * self.rttvar + RTT_BETA * abs(self.srtt - rtt)
+        self.srtt = (1 - RTT_ALPHA) * self.srtt + RTT_ALPHA * rtt
+        self.samples += 1
+        self.backoff = 1
+
+
+class AcondLatencyEstimator:
+    """
+    Derives the timeout of every request from the latency of its page.
+
+    The timeout is the smoothed round trip time plus four times its
+    variation, at least the floor. It is doubled after every timeout until
+    a request of the page succeeds again, up to the ceiling. This is
+    the retransmission timeout of TCP, per page instead of per connection,
+    as pages take the embedded web server very different times to render.
+    """
+
+    def __init__(
+        self,
+        floor: float = DEFAULT_TIMEOUT_FLOOR,
+        ceiling: float = DEFAULT_TIMEOUT_CEILING,
+    ) -> None:
+        """Initialize the estimator."""
+        self.floor = floor
+        self.ceiling = ceiling
+        self._estimates: dict[str, AcondLatencyEstimate] = {}
+
+    def timeout(self, key: str) -> float:
+        """Return the timeout of a request."""
+        if (estimate := self._estimates.get(key)) is None:
+            return self.ceiling
+
+        timeout = max(self.floor, estimate.srtt + RTT_K * estimate.rttvar)
+        return min(self.ceiling, timeout * estimate.backoff)
+
+    def record(self, key: str, rtt: float) -> None:
+        """Record the round trip time of a completed request."""
+        if (estimate := self._estimates.get(key)) is None:
+            self._estimates[key] = AcondLatencyEstimate(srtt=rtt, rttvar=rtt / 2)
+        else:
+            estimate.update(rtt)
+
+    def record_timeout(self, key: str) -> None:
+        """Back off the timeout of a page after a request timed out."""
+        if (estimate := self._estimates.get(key)) is not None:
+            estimate.timeouts += 1
+            if self.timeout(key) < self.ceiling:
+                estimate.backoff *= 2
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the learned estimates and timeouts per page."""
+        return {
+            key: {
+                "srtt": estimate.srtt,
+                "rttvar": estimate.rttvar,
+                "timeout": self.timeout(key),
+                "samples": estimate.samples,
+                "timeouts": estimate.timeouts,
+            }
+            for key, estimate in self._estimates.items()
+        }
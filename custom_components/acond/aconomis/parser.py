@@ -0,0 +1,195 @@
+"""Byte-level parsing of Acond Aconomis pages."""
+
+from __future__ import annotations
+
+import codecs
+import contextlib
+import html
+import re
+
+DEFAULT_ENCODING = "utf-8"
+
+# Only the XML declaration at the start of the document is inspected
+_XML_DECLARATION_SIZE = 256
+_XML_ENCODING = re.compile(
+    rb"""<\?xml[^>]*?\bencoding\s*=\s*["']([A-Za-z0-9._-]+)["']"""
+)
+# Attribute values may contain ">"
+_INPUT_TAG = re.compile(rb"""<INPUT\b([^>"']*+(?:(?:"[^"]*+"|'[^']*+')[^>"']*+)*+)>""")
+# Pages with comments or CDATA sections also match those, without a group,
+# to skip the INPUT tags hidden in them
+_INPUT_TAG_OR_HIDDEN = re.compile(
+    rb"<!--.*?-->|<!\[CDATA\[.*?\]\]>|" + _INPUT_TAG.pattern, re.DOTALL
+)
+_HIDDEN_SECTION = re.compile(rb"<!--|<!\[CDATA\[")
+_INPUT_ATTRIBUTE = re.compile(rb"""([^\s=/>"']+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+# Line ends and whitespace in attribute values are normalized to spaces
+_ATTRIBUTE_WHITESPACE = re.compile(r"\r\n|[\t\n\r]")
+# Other control characters are not allowed in XML, parsers replace them
+_ATTRIBUTE_CONTROL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def detect_encoding(body: bytes, fallback: str | None = None) -> str:
+    """Detect the encoding of a page from its XML declaration."""
+    for candidate in (_declared_encoding(body), fallback):
+        if candidate is None:
+            continue
+        with contextlib.suppress(LookupError):
+            return codecs.lookup(candidate).name
+
+    return DEFAULT_ENCODING
+
+
+def _declared_encoding(body: bytes) -> str | None:
+    """Return the encoding named in the XML declaration, if any."""
+    match = _XML_ENCODING.search(body, 0, _XML_DECLARATION_SIZE)
+    return match.group(1).decode("ascii") if match else None
+
+
+def decode_attribute(raw: bytes, encoding: str) -> str:
+    """Decode a single attribute value, resolving character references."""
+    value = raw.decode(encoding, "replace")
+    if not value.isprintable():
+        value = _ATTRIBUTE_CONTROL.sub("\ufffd", _ATTRIBUTE_WHITESPACE.sub(" ", value))
+    return html.unescape(value) if "&" in value else value
+
+
+def _input_tags(body: bytes) -> re.Pattern[bytes]:
+    """Return the pattern that finds the INPUT tags of a body."""
+    return _INPUT_TAG_OR_HIDDEN if b"<!" in body else _INPUT_TAG
+
+
+def _tag_attributes(tag: re.Match[bytes]) -> tuple[bytes | None, bytes | None]:
+    """Return the raw NAME and VALUE attributes of an INPUT tag."""
+    attributes = {
+        match.group(1): match.group(2) if match.group(2) is not None else match.group(3)
+        for match in _INPUT_ATTRIBUTE.finditer(tag.group(1))
+    }
+    return attributes.get(b"NAME"), attributes.get(b"VALUE")
+
+
+def extract_inputs(body: bytes, encoding: str) -> list[tuple[str, str]]:
+    """
+    Extract the NAME and VALUE attributes of all INPUT elements.
+
+    Only the attribute values are decoded, the rest of the body is never
+    turned into text. Missing attributes are reported as "None", the same
+    way the BeautifulSoup based parser does. Like in a parser, inputs in
+    comments and CDATA sections are skipped, an unterminated one hides the
+    rest of the body.
+    """
+    inputs = []
+    end = 0
+    for tag in _input_tags(body).finditer(body):
+        # Everything after an unterminated comment or CDATA section is hidden
+        if _HIDDEN_SECTION.search(body, end, tag.start()):
+            break
+        if tag.group(1) is not None:
+            name, value = _tag_attributes(tag)
+            inputs.append(
+                (
+                    "None" if name is None else decode_attribute(name, encoding),
+                    "None" if value is None else decode_attribute(value, encoding),
+                )
+            )
+        end = tag.end()
+
+    return inputs
+
+
+class PageLayout:
+    """
+    Learned layout of the INPUT elements of a page.
+
+    Aconomis pages contain the same INPUT elements in the same order on every
+    poll, only their values change. The layout records the markup leading up
+    to each value, so later polls can slice the values out directly and only
+    fall back to a full parse when the markup no longer matches.
+    """
+
+    def __init__(
+        self,
+        names: tuple[str, ...],
+        anchors: tuple[bytes, ...],
+        offsets: tuple[int, ...],
+        quotes: tuple[bytes, ...],
+    ) -> None:
+        """Initialize the layout."""
+        self._names = names
+        self._anchors = anchors
+        self._offsets = offsets
+        self._quotes = quotes
+
+    def __len__(self) -> int:
+        """Return the number of INPUT elements in the layout."""
+        return len(self._names)
+
+    @classmethod
+    def learn(cls, body: bytes, encoding: str) -> PageLayout | None:
+        """Learn the layout of a page, or return None if it can not be learned."""
+        names, anchors, offsets, quotes = [], [], [], []
+
+        for tag in _input_tags(body).finditer(body):
+            # Inputs hidden in comments would be mistaken for real ones
+            if tag.group(1) is None:
+                return None
+
+            attributes = {
+                match.group(1): match
+                for match in _INPUT_ATTRIBUTE.finditer(tag.group(1))
+            }
+            name = attributes.get(b"NAME")
+            value = attributes.get(b"VALUE")
+
+            # The anchor must contain the name to be able to validate it
+            if name is None or value is None or name.start() > value.start():
+                return None
+
+            group = 2 if value.group(2) is not None else 3
+            value_start = tag.start(1) + value.start(group)
+            names.append(
+                decode_attribute(name.group(2) or name.group(3) or b"", encoding)
+            )
+            anchors.append(body[tag.start() : value_start])
+            offsets.append(tag.start())
+            quotes.append(body[value_start - 1 : value_start])
+
+        if not names:
+            return None
+
+        return cls(tuple(names), tuple(anchors), tuple(offsets), tuple(quotes))
+
+    def extract(self, body: bytes, encoding: str) -> list[tuple[str, str]] | None:
+        """Extract the inputs using the layout, or return None if it changed."""
+        if body.count(b"<INPUT") != len(self._names):
+            return None
+        # Inputs hidden in comments would be mistaken for the learned ones
+        if b"<!" in body and _HIDDEN_SECTION.search(body):
+            return None
+
+        inputs = []
+        # Values can change length, which shifts everything after them
+        shift = 0
+        position = 0
+
+        for name, anchor, offset, quote in zip(
+            self._names, self._anchors, self._offsets, self._quotes, strict=True
+        ):
+            start = offset + shift
+            if not body.startswith(anchor, start):
+                start = body.find(anchor, position)
+                if start < 0:
+                    return None
+                shift = start - offset
+
+            value_start = start + len(anchor)
+            value_end = body.find(quote, value_start)
+            if value_end < 0:
+                return None
+
+            inputs.append(
+                (name, decode_attribute(body[value_start:value_end], encoding))
+            )
+            position = value_end
+
+        return inputs
@@ -0,0 +1,138 @@
+"""Opt-in allocation profiling of poll cycles."""
+
+from __future__ import annotations
+
+import contextlib
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+STAGE_FETCH = "fetch"
+STAGE_DECODE = "decode"
+STAGE_PARSE = "parse"
+STAGE_MERGE = "merge"
+STAGE_ENTITY_UPDATE = "entity_update"
+
+STAGES = (STAGE_FETCH, STAGE_DECODE, STAGE_PARSE, STAGE_MERGE, STAGE_ENTITY_UPDATE)
+
+# Number of poll cycles kept in the history
+PROFILE_HISTORY_SIZE = 20
+
+
+class AcondMemoryBudgetExceededError(Exception):
+    """Exception to indicate that a poll cycle exceeded its memory budget."""
+
+
+@dataclass(slots=True)
+class AcondStageAllocation:
+    """Memory allocated during a stage of a poll cycle."""
+
+    # Net change of the traced memory, what the stage left behind
+    retained: int = 0
+    # Highest traced memory above the start of the stage
+    peak: int = 0
+
+
+@dataclass
+class AcondMemoryCycle:
+    """Memory allocated during a single poll cycle, per stage."""
+
+    stages: dict[str, AcondStageAllocation] = field(
+        default_factory=lambda: {stage: AcondStageAllocation() for stage in STAGES}
+    )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the allocations as a dictionary."""
+        return {
+            stage: {"retained": allocation.retained, "peak": allocation.peak}
+            for stage, allocation in self.stages.items()
+        }
+
+
+class AcondMemoryProfiler:
+    """
+    Records the memory allocated per stage of every poll cycle.
+
+    Allocations are traced with tracemalloc, which slows down everything in
+    the process, so profiling is only meant to be enabled while looking into
+    memory growth or in tests. Stages of concurrent polls of several devices
+    are attributed to whichever stage is running, profile a single device
+    for exact numbers.
+
+    The budget limits the peak allocation of each stage in bytes.
+    """
+
+    def __init__(self, budget: dict[str, int] | None = None) -> None:
+        """Initialize the profiler."""
+        self.budget = budget or {}
+        self.history: deque[AcondMemoryCycle] = deque(maxlen=PROFILE_HISTORY_SIZE)
+        self.cycles = 0
+        self._cycle = AcondMemoryCycle()
+        self._started_tracing = False
+
+    def start(self) -> None:
+        """Start tracing allocations."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        """Stop tracing allocations, if they were traced for this profiler."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextlib.contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """Record the allocations of a stage of the current cycle."""
+        if not tracemalloc.is_tracing():
+            yield
+            return
+
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            allocation = self._cycle.stages[stage]
+            allocation.retained += current - start
+            allocation.peak = max(allocation.peak, peak - start)
+
+    def end_cycle(self) -> AcondMemoryCycle:
+        """Finish the current poll cycle and start the next one."""
+        cycle, self._cycle = self._cycle, AcondMemoryCycle()
+        self.history.append(cycle)
+        self.cycles += 1
+        return cycle
+
+    def check(self, cycle: AcondMemoryCycle) -> None:
+        """Raise an error if a cycle exceeded the budget of one of its stages."""
+        exceeded = [
+            f"{stage} peaked at {cycle.stages[stage].peak} bytes (budget {limit})"
+            for stage, limit in self.budget.items()
+            if cycle.stages[stage].peak > limit
+        ]
+        if exceeded:
+            raise AcondMemoryBudgetExceededError(", ".join(exceeded))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary of the recorded cycles."""
+        history = list(self.history)
+        return {
+            "cycles": self.cycles,
+            "budget": self.budget,
+            "stages": {
+                stage: {
+                    "retained_average": sum(c.stages[stage].retained for c in history)
+                    // max(len(history), 1),
+                    "peak_max": max((c.stages[stage].peak for c in history), default=0),
+                }
+                for stage in STAGES
+            },
+            "last": history[-1].as_dict() if history else None,
+        }
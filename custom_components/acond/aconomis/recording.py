@@ -0,0 +1,208 @@
+"""Recording and replay of Acond Aconomis sessions."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import time
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# Number of buffered exchanges that triggers a write to the recording
+RECORDING_FLUSH_SIZE = 32
+
+
+@dataclass(frozen=True, slots=True)
+class AcondRecordedExchange:
+    """A single request and response of a recorded session."""
+
+    time: float
+    method: str
+    page: str
+    status: int
+    location: str | None
+    charset: str | None
+    elapsed: float
+    body: bytes
+
+    def to_json(self) -> str:
+        """Serialize the exchange to a single line."""
+        return json.dumps(
+            {
+                "t": round(self.time, 4),
+                "method": self.method,
+                "page": self.page,
+                "status": self.status,
+                "location": self.location,
+                "charset": self.charset,
+                "elapsed": round(self.elapsed, 4),
+                "body": base64.b64encode(zlib.compress(self.body)).decode("ascii"),
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, line: str) -> AcondRecordedExchange:
+        """Deserialize an exchange from a single line."""
+        record = json.loads(line)
+        return cls(
+            time=record["t"],
+            method=record["method"],
+            page=record["page"],
+            status=record["status"],
+            location=record["location"],
+            charset=record["charset"],
+            elapsed=record["elapsed"],
+            body=zlib.decompress(base64.b64decode(record["body"])),
+        )
+
+
+def read_recording(path: Path) -> list[AcondRecordedExchange]:
+    """Read all exchanges of a recording."""
+    with path.open(encoding="ascii") as file:
+        return [AcondRecordedExchange.from_json(line) for line in file if line.strip()]
+
+
+class AcondSessionRecorder:
+    """
+    Appends the exchanges of a session to a recording.
+
+    Only the method, page, status, redirect location and response body are
+    recorded. Hosts, request bodies and headers, and with them the
+    credentials and session cookies, never end up in the recording.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the recorder."""
+        self.path = path
+        self.exchanges = 0
+        self._started = time.monotonic()
+        self._buffer: list[str] = []
+        self._lock = asyncio.Lock()
+        self._flush_task: asyncio.Task[None] | None = None
+
+    def record(  # noqa: PLR0913
+        self,
+        method: str,
+        page: str,
+        status: int,
+        location: str | None,
+        charset: str | None,
+        elapsed: float,
+        body: bytes,
+    ) -> None:
+        """Record an exchange."""
+        exchange = AcondRecordedExchange(
+            time=time.monotonic() - self._started,
+            method=method,
+            page=page,
+            status=status,
+            location=location,
+            charset=charset,
+            elapsed=elapsed,
+            body=body,
+        )
+        self._buffer.append(exchange.to_json() + "\n")
+        self.exchanges += 1
+
+        if len(self._buffer) >= RECORDING_FLUSH_SIZE and self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(
+                self.async_flush()
+            )
+
+    async def async_flush(self) -> None:
+        """Write the buffered exchanges to the recording."""
+        async with self._lock:
+            self._flush_task = None
+            lines, self._buffer = self._buffer, []
+            if lines:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._write, lines
+                )
+
+    def _write(self, lines: list[str]) -> None:
+        with self.path.open("a", encoding="ascii") as file:
+            file.writelines(lines)
+
+
+class AcondReplayResponse:
+    """Stand-in for aiohttp.ClientResponse that answers from a recording."""
+
+    def __init__(self, method: str, url: str, exchange: AcondRecordedExchange) -> None:
+        """Initialize the response."""
+        self.method = method
+        self.url = URL(url)
+        self.status = exchange.status
+        self.charset = exchange.charset
+        self.headers = CIMultiDictProxy(
+            CIMultiDict({"Location": exchange.location} if exchange.location else {})
+        )
+        self._body = exchange.body
+
+    async def read(self) -> bytes:
+        """Return the recorded body."""
+        return self._body
+
+    def raise_for_status(self) -> None:
+        """Raise an error if the recorded status is an error."""
+        if self.status >= 400:  # noqa: PLR2004
+            raise aiohttp.ClientResponseError(
+                aiohttp.RequestInfo(self.url, self.method, self.headers, self.url),
+                (),
+                status=self.status,
+            )
+
+
+class AcondReplaySession:
+    """
+    Stand-in for aiohttp.ClientSession that answers from a recording.
+
+    Requests are answered with the recorded exchanges for the same method
+    and page, in order, starting over when they run out. The recorded
+    response times are replayed divided by the speed, a speed of 0 answers
+    immediately.
+    """
+
+    def __init__(
+        self, exchanges: list[AcondRecordedExchange], speed: float = 1.0
+    ) -> None:
+        """Initialize the session."""
+        self._speed = speed
+        self._exchanges: dict[tuple[str, str], list[AcondRecordedExchange]] = (
+            defaultdict(list)
+        )
+        self._positions: dict[tuple[str, str], int] = defaultdict(int)
+        for exchange in exchanges:
+            self._exchanges[(exchange.method, exchange.page)].append(exchange)
+
+    async def request(
+        self, method: str, url: str, **kwargs: Any
+    ) -> AcondReplayResponse:
+        """Answer a request from the recording."""
+        del kwargs
+        key = (method, URL(url).path.lstrip("/"))
+        exchanges = self._exchanges.get(key)
+        if not exchanges:
+            msg = f"No recorded exchange for {method.upper()} {key[1]}"
+            raise aiohttp.ClientConnectionError(msg)
+
+        exchange = exchanges[self._positions[key] % len(exchanges)]
+        self._positions[key] += 1
+
+        if self._speed > 0:
+            await asyncio.sleep(exchange.elapsed / self._speed)
+
+        return AcondReplayResponse(method, url, exchange)
+
+    async def close(self) -> None:
+        """Close the session."""
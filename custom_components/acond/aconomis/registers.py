@@ -0,0 +1,185 @@
+"""Register catalog for Acond Aconomis."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .const import ACOND_ACONOMIS_DATA_MAPPINGS
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+# Register names look like __T61D2108E_REAL_.1f or __TA9A7CFD0_STRING[10]_s
+_REGISTER_NAME = re.compile(
+    r"^__T[0-9A-F]+_(?P<type>[A-Z]+)(?:\[(?P<length>\d+)\])?_(?P<format>.+)$"
+)
+_FLOAT_FORMAT = re.compile(r"^\.(?P<precision>\d+)f$")
+
+_REAL_TYPES = frozenset(("REAL", "LREAL"))
+_INTEGER_RANGES = {
+    "SINT": (-(2**7), 2**7 - 1),
+    "USINT": (0, 2**8 - 1),
+    "BYTE": (0, 2**8 - 1),
+    "INT": (-(2**15), 2**15 - 1),
+    "UINT": (0, 2**16 - 1),
+    "WORD": (0, 2**16 - 1),
+    "DINT": (-(2**31), 2**31 - 1),
+    "UDINT": (0, 2**32 - 1),
+    "DWORD": (0, 2**32 - 1),
+    "LINT": (-(2**63), 2**63 - 1),
+    "ULINT": (0, 2**64 - 1),
+    "LWORD": (0, 2**64 - 1),
+}
+
+_MAPPED_REGISTERS = frozenset(ACOND_ACONOMIS_DATA_MAPPINGS.values())
+
+
+def _decode_real(raw: str) -> Any:
+    return float(raw)
+
+
+def _real_decoder(precision: int | None) -> Callable[[str], Any]:
+    if precision is None:
+        return _decode_real
+
+    def decode(raw: str) -> Any:
+        return round(float(raw), precision)
+
+    return decode
+
+
+def _decode_bool(raw: str) -> Any:
+    return bool(int(raw)) or False
+
+
+def _integer_decoder(minimum: int, maximum: int) -> Callable[[str], Any]:
+    def decode(raw: str) -> Any:
+        value = int(raw)
+        if not minimum <= value <= maximum:
+            msg = f"{value} out of range [{minimum}, {maximum}]"
+            raise ValueError(msg)
+        return value
+
+    return decode
+
+
+def _string_decoder(length: int | None) -> Callable[[str], Any]:
+    def decode(raw: str) -> Any:
+        if length is not None and len(raw) > length:
+            msg = f"String longer than {length} characters"
+            raise ValueError(msg)
+        return raw
+
+    return decode
+
+
+def _decode_legacy(name: str) -> Callable[[str], Any] | None:
+    """Return a decoder for names without a recognized type suffix."""
+    if name.endswith("f"):
+        return _decode_real
+    if name.endswith("USINT_u"):
+        return _integer_decoder(*_INTEGER_RANGES["USINT"])
+    if name.endswith("BOOL_i"):
+        return _decode_bool
+    return None
+
+
+@dataclass(slots=True)
+class AcondRegister:
+    """A register with its compiled decoder."""
+
+    name: str
+    type: str | None
+    length: int | None
+    precision: int | None
+    decoder: Callable[[str], Any] | None
+    invalid: int = 0
+
+    @property
+    def known(self) -> bool:
+        """Return whether the type of the register was recognized."""
+        return self.type is not None
+
+    def decode(self, raw: str) -> Any:
+        """Decode a raw value, keeping it as a string if it is not valid."""
+        if self.decoder is None:
+            return raw
+
+        try:
+            return self.decoder(raw)
+        except (TypeError, ValueError):
+            self.invalid += 1
+            return raw
+
+    @classmethod
+    def compile(cls, name: str) -> AcondRegister:
+        """Compile a register from its name."""
+        match = _REGISTER_NAME.match(name)
+        if match is None:
+            return cls(name, None, None, None, _decode_legacy(name))
+
+        type_ = match.group("type")
+        length = int(match.group("length")) if match.group("length") else None
+        float_format = _FLOAT_FORMAT.match(match.group("format"))
+        precision = int(float_format.group("precision")) if float_format else None
+
+        if type_ in _REAL_TYPES:
+            decoder = _real_decoder(precision)
+        elif type_ == "BOOL":
+            decoder = _decode_bool
+        elif type_ in _INTEGER_RANGES:
+            decoder = _integer_decoder(*_INTEGER_RANGES[type_])
+        elif type_ == "STRING":
+            decoder = _string_decoder(length)
+        else:
+            return cls(name, None, length, precision, _decode_legacy(name))
+
+        return cls(name, type_, length, precision, decoder)
+
+
+class AcondRegisterCatalog:
+    """Catalog of all registers seen on the device."""
+
+    def __init__(self) -> None:
+        """Initialize the catalog."""
+        self._registers: dict[str, AcondRegister] = {}
+
+    def __len__(self) -> int:
+        """Return the number of registers in the catalog."""
+        return len(self._registers)
+
+    def get(self, name: str) -> AcondRegister:
+        """Get a register, compiling it the first time it is seen."""
+        register = self._registers.get(name)
+        if register is None:
+            register = self._registers[name] = AcondRegister.compile(name)
+        return register
+
+    def decode(self, name: str, raw: str) -> Any:
+        """Decode a single register value."""
+        return self.get(name).decode(raw)
+
+    def decode_inputs(self, inputs: Iterable[tuple[str, str]]) -> dict[str, Any]:
+        """Decode extracted INPUT elements to a register dictionary."""
+        registers = self._registers
+        results = {}
+
+        for name, raw in inputs:
+            register = registers.get(name) or self.get(name)
+            results[name] = register.decode(raw)
+
+        return results
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary of the catalog for diagnostics."""
+        registers = self._registers.values()
+        return {
+            "registers": len(self._registers),
+            "unknown_types": sorted(r.name for r in registers if not r.known),
+            "unmapped": sorted(
+                r.name for r in registers if r.name not in _MAPPED_REGISTERS
+            ),
+            "invalid": {r.name: r.invalid for r in registers if r.invalid},
+        }
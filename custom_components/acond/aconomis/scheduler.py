@@ -0,0 +1,159 @@
+"""Prioritized request scheduling for a single Acond device."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+# The embedded web server is easily overwhelmed, keep the request rate low
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 5
+
+
+class AcondRequestPriority(IntEnum):
+    """Priority classes for requests, lower values are served first."""
+
+    INTERACTIVE = 0
+    READBACK = 1
+    POLL = 2
+    DIAGNOSTIC = 3
+
+
+@dataclass
+class AcondPriorityStats:
+    """Queue statistics for a single priority class."""
+
+    submitted: int = 0
+    completed: int = 0
+    waiting: int = 0
+    wait_time: float = 0.0
+    wait_time_max: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics as a dictionary."""
+        started = self.submitted - self.waiting
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "waiting": self.waiting,
+            "wait_time_average": self.wait_time / started if started else 0.0,
+            "wait_time_max": self.wait_time_max,
+        }
+
+
+class AcondRequestScheduler:
+    """
+    Serializes requests to a device by priority, behind a token bucket.
+
+    Only one request is in flight at a time. When the slot frees up, the
+    oldest request of the highest priority class goes next, as soon as the
+    token bucket allows it.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST) -> None:
+        """Initialize the scheduler."""
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._busy = False
+        self._wakeup: asyncio.TimerHandle | None = None
+        self._stats = {
+            priority: AcondPriorityStats() for priority in AcondRequestPriority
+        }
+
+    @property
+    def depth(self) -> int:
+        """Return the number of requests waiting for the slot."""
+        return sum(stats.waiting for stats in self._stats.values())
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: AcondRequestPriority) -> AsyncIterator[None]:
+        """Wait for the turn of a request and hold the slot while it runs."""
+        stats = self._stats[priority]
+        stats.submitted += 1
+        stats.waiting += 1
+        enqueued = time.monotonic()
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        self._wake()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            stats.waiting -= 1
+            # The slot may have been granted right before the cancellation
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+
+        stats.waiting -= 1
+        wait_time = time.monotonic() - enqueued
+        stats.wait_time += wait_time
+        stats.wait_time_max = max(stats.wait_time_max, wait_time)
+
+        try:
+            yield
+        finally:
+            stats.completed += 1
+            self._release()
+
+    def _release(self) -> None:
+        """Release the slot and hand it to the next request."""
+        self._busy = False
+        self._wake()
+
+    def _wake(self) -> None:
+        """Grant the slot to the next request if possible."""
+        if self._busy or self._wakeup is not None:
+            return
+
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if not self._waiters:
+            return
+
+        now = time.monotonic()
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._refilled) * self._rate
+        )
+        self._refilled = now
+
+        if self._tokens < 1:
+            self._wakeup = asyncio.get_running_loop().call_later(
+                (1 - self._tokens) / self._rate, self._wake_later
+            )
+            return
+
+        self._tokens -= 1
+        self._busy = True
+        heapq.heappop(self._waiters)[2].set_result(None)
+
+    def _wake_later(self) -> None:
+        """Retry granting the slot once a token is available."""
+        self._wakeup = None
+        self._wake()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the queue statistics as a dictionary."""
+        return {
+            "depth": self.depth,
+            "tokens": self._tokens,
+            "priorities": {
+                priority.name.lower(): stats.as_dict()
+                for priority, stats in self._stats.items()
+            },
+        }
@@ -0,0 +1,115 @@
+"""Rolling trace of the recent poll cycles of a device."""
+
+from __future__ import annotations
+
+import contextlib
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+TRACE_CYCLES = 50
+
+
+@dataclass(slots=True)
+class AcondRequestTrace:
+    """A request made during a poll cycle."""
+
+    method: str
+    page: str
+    timeout: float
+    status: int | None = None
+    size: int | None = None
+    elapsed: float | None = None
+    parse_time: float | None = None
+    error: str | None = None
+
+
+@dataclass(slots=True)
+class AcondCycleTrace:
+    """A poll cycle with its requests."""
+
+    # Wall clock time, for matching the cycle with the log
+    start: float
+    duration: float = 0.0
+    requests: list[AcondRequestTrace] = field(default_factory=list)
+    relogins: int = 0
+    changed: int | None = None
+    error: str | None = None
+
+
+# Cycle traced in the current task. Writes and logins made by other tasks
+# while a poll runs see no cycle.
+_current_cycle: ContextVar[AcondCycleTrace | None] = ContextVar(
+    "acond_current_cycle", default=None
+)
+
+
+class AcondPollTracer:
+    """
+    Keeps a bounded ring of the recent poll cycles.
+
+    Tracing stays enabled all the time, a cycle only adds a few small
+    objects and the oldest cycle is dropped when the ring is full. Requests
+    are attributed to the cycle of the task making them, requests outside
+    of poll cycles, like writes, are not traced.
+    """
+
+    def __init__(self, size: int = TRACE_CYCLES) -> None:
+        """Initialize the tracer."""
+        self.cycles: deque[AcondCycleTrace] = deque(maxlen=size)
+        self._previous: dict[str, Any] | None = None
+
+    @contextlib.contextmanager
+    def cycle(self) -> Iterator[AcondCycleTrace]:
+        """Trace a poll cycle, recording the error it failed with if any."""
+        trace = AcondCycleTrace(start=time.time())
+        token = _current_cycle.set(trace)
+        start = time.monotonic()
+        try:
+            yield trace
+        except Exception as exception:
+            trace.error = f"{type(exception).__name__}: {exception}"
+            raise
+        finally:
+            trace.duration = time.monotonic() - start
+            _current_cycle.reset(token)
+            self.cycles.append(trace)
+
+    def request(self, method: str, page: str, timeout: float) -> AcondRequestTrace:
+        """Start tracing a request, only kept as part of the current cycle."""
+        trace = AcondRequestTrace(method.upper(), page, timeout)
+        if (cycle := _current_cycle.get()) is not None:
+            cycle.requests.append(trace)
+        return trace
+
+    def parsed(self, page: str, duration: float) -> None:
+        """Record the parse duration of the latest request of a page."""
+        if (cycle := _current_cycle.get()) is None:
+            return
+        for request in reversed(cycle.requests):
+            if request.page == page:
+                request.parse_time = duration
+                return
+
+    def relogin(self) -> None:
+        """Record a login after the session expired."""
+        if (cycle := _current_cycle.get()) is not None:
+            cycle.relogins += 1
+
+    def changes(self, trace: AcondCycleTrace, result: dict[str, Any]) -> None:
+        """Count the registers the result of a cycle changed."""
+        previous = self._previous
+        if previous is not None:
+            trace.changed = sum(
+                1 for key, value in result.items() if previous.get(key) != value
+            ) + sum(1 for key in previous if key not in result)
+        self._previous = result
+
+    def as_dict(self) -> list[dict[str, Any]]:
+        """Return the traced cycles, oldest first."""
+        return [asdict(cycle) for cycle in self.cycles]
@@ -0,0 +1,121 @@
+"""High rate capture of the measurement page."""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import math
+import time
+from array import array
+from typing import TYPE_CHECKING, Any
+
+from .aconomis.api import AcondApiClientError
+from .aconomis.const import ACOND_ACONOMIS_DATA_MAPPINGS
+from .aconomis.registers import AcondRegister
+from .const import LOGGER
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from .aconomis.api import AcondApiClient
+
+BURST_DURATION = 300.0
+BURST_INTERVAL = 1.0
+
+# Only numeric registers are captured, booleans as 0 and 1
+BURST_KEYS = tuple(
+    key
+    for key, name in ACOND_ACONOMIS_DATA_MAPPINGS.items()
+    if AcondRegister.compile(name).type not in (None, "STRING")
+)
+
+
+class AcondBurstCapture:
+    """
+    Samples the measurement page at a high rate for a bounded duration.
+
+    Samples are written to columns that are allocated for the whole capture
+    up front, so a capture does not allocate per sample. Registers missing
+    from a sample are kept as NaN.
+    """
+
+    def __init__(
+        self, duration: float = BURST_DURATION, interval: float = BURST_INTERVAL
+    ) -> None:
+        """Initialize the capture."""
+        self.interval = interval
+        self.capacity = max(1, int(duration / interval))
+        self.length = 0
+        self.errors = 0
+        self.times = array("d", [0.0]) * self.capacity
+        self.columns = {
+            key: array("d", [math.nan]) * self.capacity for key in BURST_KEYS
+        }
+
+    def append(self, timestamp: float, data: dict[str, Any]) -> None:
+        """Append a sample of the measurement page."""
+        index = self.length
+        self.times[index] = timestamp
+        for key, column in self.columns.items():
+            value = data.get(ACOND_ACONOMIS_DATA_MAPPINGS[key])
+            if isinstance(value, int | float):
+                column[index] = float(value)
+        self.length += 1
+
+    async def async_run(self, client: AcondApiClient) -> None:
+        """Sample the measurement page until the capture is full."""
+        start = time.monotonic()
+        while self.length < self.capacity:
+            try:
+                data = await client.async_get_measurements()
+            except AcondApiClientError as exception:
+                self.errors += 1
+                LOGGER.debug("Burst capture sample failed: %s", exception)
+                self.times[self.length] = time.time()
+                self.length += 1
+            else:
+                self.append(time.time(), data)
+
+            # Keep to the interval on average, a slow sample is not made up for
+            delay = start + self.length * self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    def write_csv(self, path: Path) -> None:
+        """Write the captured samples, leaving out registers never sampled."""
+        columns = {
+            key: column
+            for key, column in self.columns.items()
+            if any(not math.isnan(value) for value in column[: self.length])
+        }
+        with path.open("w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["time", *(key.lower() for key in columns)])
+            for index in range(self.length):
+                writer.writerow(
+                    [
+                        f"{self.times[index]:.3f}",
+                        *(
+                            "" if math.isnan(column[index]) else column[index]
+                            for column in columns.values()
+                        ),
+                    ]
+                )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary of the captured samples."""
+        summary = {}
+        for key, column in self.columns.items():
+            values = [value for value in column[: self.length] if not math.isnan(value)]
+            if values:
+                summary[key.lower()] = {
+                    "min": min(values),
+                    "max": max(values),
+                    "mean": sum(values) / len(values),
+                }
+        return {
+            "samples": self.length,
+            "errors": self.errors,
+            "interval": self.interval,
+            "registers": summary,
+        }
@@ -12,7 +12,11 @@ from homeassistant.components.climate import (
 )
 from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
 
-from .const import ACOND_ACONOMIS_DATA_MAPPINGS, AcondOperatingMode, AcondRegulationMode
+from .aconomis.const import (
+    ACOND_ACONOMIS_DATA_MAPPINGS,
+    AcondOperatingMode,
+    AcondRegulationMode,
+)
 from .data import AcondConfigEntry
 from .entity import AcondEntity
 
@@ -2,19 +2,31 @@
 
 from __future__ import annotations
 
+from ipaddress import ip_network
+from typing import TYPE_CHECKING
+
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.components import network
 from homeassistant.const import CONF_IP_ADDRESS, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.helpers import selector
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from slugify import slugify
 
-from .api import (
+from .aconomis.api import (
     AcondApiClient,
     AcondApiClientAuthenticationError,
     AcondApiClientCommunicationError,
     AcondApiClientError,
 )
-from .const import DOMAIN, LOGGER
+from .aconomis.discovery import AcondDiscoveredController, async_discover
+from .const import CONF_STORE_SAMPLES, DOMAIN, LOGGER
+
+if TYPE_CHECKING:
+    from .aconomis.scheduler import AcondRequestScheduler
+
+CONF_NETWORK = "network"
 
 
 class AcondFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -22,47 +34,175 @@ class AcondFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize the config flow."""
+        self._discovered: dict[str, AcondDiscoveredController] = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,  # noqa: ARG004
+    ) -> AcondOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return AcondOptionsFlowHandler()
+
     async def async_step_user(
         self,
-        user_input: dict | None = None,
+        user_input: dict | None = None,  # noqa: ARG002
     ) -> config_entries.ConfigFlowResult:
         """Handle a flow initialized by the user."""
+        return self.async_show_menu(
+            step_id="user",
+            menu_options=["discover", "manual"],
+        )
+
+    async def async_step_manual(
+        self,
+        user_input: dict | None = None,
+    ) -> config_entries.ConfigFlowResult:
+        """Handle a controller entered by its IP address."""
+        _errors = {}
+        if user_input is not None:
+            _errors = await self._async_validate_input(user_input)
+            if not _errors:
+                return await self._async_create_entry(user_input)
+
+        return self._async_show_auth_form(
+            step_id="manual",
+            user_input=user_input,
+            errors=_errors,
+        )
+
+    async def async_step_discover(
+        self,
+        user_input: dict | None = None,
+    ) -> config_entries.ConfigFlowResult:
+        """Scan a network for controllers."""
         _errors = {}
         if user_input is not None:
             try:
-                await self._test_credentials(
-                    ip_address=user_input[CONF_IP_ADDRESS],
-                    username=user_input[CONF_USERNAME],
-                    password=user_input[CONF_PASSWORD],
-                )
-            except AcondApiClientAuthenticationError as exception:
+                controllers = await async_discover(user_input[CONF_NETWORK])
+            except ValueError as exception:
                 LOGGER.warning(exception)
-                _errors["base"] = "auth"
-            except AcondApiClientCommunicationError as exception:
-                LOGGER.error(exception)
-                _errors["base"] = "connection"
-            except AcondApiClientError as exception:
-                LOGGER.exception(exception)
-                _errors["base"] = "unknown"
+                _errors[CONF_NETWORK] = "invalid_network"
             else:
-                await self.async_set_unique_id(
-                    ## Do NOT use this in production code
-                    ## The unique_id should never be something that can change
-                    ## https://developers.home-assistant.io/docs/config_entries_config_flow_handler#unique-ids
-                    unique_id=slugify(user_input[CONF_USERNAME])
-                )
-                self._abort_if_unique_id_configured()
-                return self.async_create_entry(
-                    title=user_input[CONF_USERNAME],
-                    data=user_input,
-                )
+                configured = {
+                    entry.data[CONF_IP_ADDRESS]
+                    for entry in self._async_current_entries()
+                }
+                self._discovered = {
+                    controller.host: controller
+                    for controller in controllers
+                    if controller.host not in configured
+                }
+                if self._discovered:
+                    return await self.async_step_pick_controller()
+                _errors["base"] = "no_devices_found"
 
-        return self._async_show_auth_form(
-            step_id="user",
-            user_input=user_input,
+        default = (user_input or {}).get(CONF_NETWORK)
+        if default is None:
+            source_ip = await network.async_get_source_ip(self.hass)
+            default = str(ip_network(f"{source_ip}/24", strict=False))
+
+        return self.async_show_form(
+            step_id="discover",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_NETWORK, default=default): selector.TextSelector(
+                        selector.TextSelectorConfig(
+                            type=selector.TextSelectorType.TEXT,
+                        ),
+                    ),
+                },
+            ),
             errors=_errors,
         )
 
+    async def async_step_pick_controller(
+        self,
+        user_input: dict | None = None,
+    ) -> config_entries.ConfigFlowResult:
+        """Handle picking one of the discovered controllers."""
+        _errors = {}
+        if user_input is not None and CONF_USERNAME in user_input:
+            _errors = await self._async_validate_input(user_input)
+            if not _errors:
+                return await self._async_create_entry(user_input)
+
+        options = [
+            selector.SelectOptionDict(
+                value=controller.host,
+                label=" ".join(
+                    filter(
+                        None,
+                        (
+                            controller.host,
+                            controller.mac_address,
+                            controller.software_version,
+                        ),
+                    )
+                ),
+            )
+            for controller in self._discovered.values()
+        ]
+        return self.async_show_form(
+            step_id="pick_controller",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_IP_ADDRESS): selector.SelectSelector(
+                        selector.SelectSelectorConfig(options=options),
+                    ),
+                    vol.Required(CONF_USERNAME): selector.TextSelector(
+                        selector.TextSelectorConfig(
+                            type=selector.TextSelectorType.TEXT,
+                        ),
+                    ),
+                    vol.Required(CONF_PASSWORD): selector.TextSelector(
+                        selector.TextSelectorConfig(
+                            type=selector.TextSelectorType.PASSWORD,
+                        ),
+                    ),
+                },
+            ),
+            errors=_errors,
+        )
+
+    async def _async_validate_input(self, user_input: dict) -> dict[str, str]:
+        """Test the credentials and return the errors, if any."""
+        try:
+            await self._test_credentials(
+                ip_address=user_input[CONF_IP_ADDRESS],
+                username=user_input[CONF_USERNAME],
+                password=user_input[CONF_PASSWORD],
+            )
+        except AcondApiClientAuthenticationError as exception:
+            LOGGER.warning(exception)
+            return {"base": "auth"}
+        except AcondApiClientCommunicationError as exception:
+            LOGGER.error(exception)
+            return {"base": "connection"}
+        except AcondApiClientError as exception:
+            LOGGER.exception(exception)
+            return {"base": "unknown"}
+
+        return {}
+
+    async def _async_create_entry(
+        self, user_input: dict
+    ) -> config_entries.ConfigFlowResult:
+        """Create the entry for validated input."""
+        await self.async_set_unique_id(
+            ## Do NOT use this in production code
+            ## The unique_id should never be something that can change
+            ## https://developers.home-assistant.io/docs/config_entries_config_flow_handler#unique-ids
+            unique_id=slugify(user_input[CONF_USERNAME])
+        )
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(
+            title=user_input[CONF_USERNAME],
+            data=user_input,
+        )
+
     async def async_step_reauth(
         self, entry_data: dict[str, str]
     ) -> config_entries.ConfigFlowResult:
@@ -80,22 +220,8 @@ class AcondFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         errors = {}
         reauth_entry = self._get_reauth_entry()
         if user_input is not None:
-            try:
-                await self._test_credentials(
-                    ip_address=user_input[CONF_IP_ADDRESS],
-                    username=user_input[CONF_USERNAME],
-                    password=user_input[CONF_PASSWORD],
-                )
-            except AcondApiClientAuthenticationError as exception:
-                LOGGER.warning(exception)
-                errors["base"] = "auth"
-            except AcondApiClientCommunicationError as exception:
-                LOGGER.error(exception)
-                errors["base"] = "connection"
-            except AcondApiClientError as exception:
-                LOGGER.exception(exception)
-                errors["base"] = "unknown"
-            else:
+            errors = await self._async_validate_input(user_input)
+            if not errors:
                 return self.async_update_reload_and_abort(
                     reauth_entry,
                     data=user_input,
@@ -148,7 +274,44 @@ class AcondFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             ip_address=ip_address,
             username=username,
             password=password,
+            session=async_get_clientsession(self.hass),
+            scheduler=self._loaded_scheduler(ip_address),
         )
         response = await client.login()
 
         LOGGER.debug("Response from login: %s", response)
+
+    def _loaded_scheduler(self, ip_address: str) -> AcondRequestScheduler | None:
+        """Return the request scheduler of a loaded entry of the controller."""
+        # The login shares the request rate of the polls of the entry, the
+        # web server of the controller is easily overwhelmed
+        for entry in self.hass.config_entries.async_loaded_entries(DOMAIN):
+            if entry.data[CONF_IP_ADDRESS] == ip_address:
+                return entry.runtime_data.client.scheduler
+        return None
+
+
+class AcondOptionsFlowHandler(config_entries.OptionsFlow):
+    """Options flow for Acond."""
+
+    async def async_step_init(
+        self,
+        user_input: dict | None = None,
+    ) -> config_entries.ConfigFlowResult:
+        """Manage the options, the entry is reloaded when they change."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_STORE_SAMPLES,
+                        default=self.config_entry.options.get(
+                            CONF_STORE_SAMPLES, False
+                        ),
+                    ): selector.BooleanSelector(),
+                },
+            ),
+        )
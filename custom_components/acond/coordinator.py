@@ -2,35 +2,297 @@
 
 from __future__ import annotations
 
+import time
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+from homeassistant.core import Event, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .api import (
+from .aconomis.api import (
     AcondApiClientAuthenticationError,
     AcondApiClientError,
 )
-from .const import ACOND_ACONOMIS_DATA_MAPPINGS, AcondOperatingMode
+from .aconomis.const import ACOND_ACONOMIS_DATA_MAPPINGS, AcondOperatingMode
+from .aconomis.profiling import STAGE_ENTITY_UPDATE, AcondMemoryBudgetExceededError
+from .const import (
+    ACOND_ENTITY_REGISTERS,
+    ACOND_FEATURE_REGISTERS,
+    CONF_STORE_SAMPLES,
+    DOMAIN,
+    LOGGER,
+)
+from .events import EVENT_DEFROST_STARTED, AcondTransitionDetector
+from .external_statistics import ACOND_STATISTICS, AcondStatisticsImporter
+from .schedule import AcondScheduleEngine, AcondSetpointSchedule
+from .timeseries import AcondSampleStore
 
 if TYPE_CHECKING:
+    import asyncio
+    import logging
+    from collections.abc import Iterable
+    from datetime import timedelta
+
+    from homeassistant.core import HomeAssistant
+
+    from .aconomis.equitherm import AcondEquithermCurve
+    from .burst import AcondBurstCapture
     from .data import AcondConfigEntry
 
 
+SCHEDULE_STORAGE_VERSION = 1
+
+
+def schedule_storage_key(entry: AcondConfigEntry) -> str:
+    """Return the storage key of the setpoint schedules of an entry."""
+    return f"{DOMAIN}.{entry.entry_id}.schedules"
+
+
+def sample_store_path(hass: HomeAssistant, entry: AcondConfigEntry) -> Path:
+    """Return the directory of the raw samples of an entry."""
+    return Path(hass.config.path(DOMAIN, "samples", entry.entry_id))
+
+
 # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
 class AcondDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching data from the API."""
 
     config_entry: AcondConfigEntry
 
+    # Poll counters, exported by the metrics endpoint
+    polls: int = 0
+    poll_failures: int = 0
+    poll_time: float = 0.0
+
+    # Running burst capture, and one waiting for the next defrost
+    burst_capture: AcondBurstCapture | None = None
+    burst_on_defrost: tuple[AcondBurstCapture, Path] | None = None
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        logger: logging.Logger,
+        name: str,
+        update_interval: timedelta,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass=hass, logger=logger, name=name, update_interval=update_interval
+        )
+        self.transitions = AcondTransitionDetector()
+        self.statistics = AcondStatisticsImporter(hass, self.config_entry)
+        self.samples = (
+            AcondSampleStore(sample_store_path(hass, self.config_entry))
+            if self.config_entry.options.get(CONF_STORE_SAMPLES, False)
+            else None
+        )
+        self.schedules = AcondScheduleEngine()
+        self._schedule_task: asyncio.Task[None] | None = None
+        self._schedule_store: Store[dict[str, list[dict[str, Any]]]] = Store(
+            hass, SCHEDULE_STORAGE_VERSION, schedule_storage_key(self.config_entry)
+        )
+        # Registers needed by every feature other than the entities
+        self._feature_registers: dict[str, frozenset[str]] = {
+            **{
+                feature: frozenset(keys)
+                for feature, keys in ACOND_FEATURE_REGISTERS.items()
+            },
+            "statistics": frozenset(key for key, *_ in ACOND_STATISTICS),
+            # The metrics endpoint exports every mapped register
+            "metrics": frozenset(ACOND_ACONOMIS_DATA_MAPPINGS),
+        }
+        if self.samples is not None:
+            self._feature_registers["samples"] = frozenset(self.samples.keys)
+
     async def _async_update_data(self) -> Any:
         """Update data via library."""
+        self.polls += 1
+        start = time.perf_counter()
         try:
-            return await self.config_entry.runtime_data.client.async_get_all()
+            data = await self.config_entry.runtime_data.client.async_get_all()
         except AcondApiClientAuthenticationError as exception:
+            self.poll_failures += 1
             raise ConfigEntryAuthFailed(exception) from exception
         except AcondApiClientError as exception:
+            self.poll_failures += 1
             raise UpdateFailed(exception) from exception
+        finally:
+            self.poll_time += time.perf_counter() - start
+
+        return data
+
+    async def async_load_schedules(self) -> None:
+        """Restore the setpoint schedules of the device."""
+        stored = await self._schedule_store.async_load() or {}
+        self.schedules.schedules = {
+            target: AcondSetpointSchedule.from_list(slots)
+            for target, slots in stored.items()
+        }
+
+    async def async_set_schedule(
+        self, target: str, schedule: AcondSetpointSchedule | None
+    ) -> None:
+        """Replace or clear a setpoint schedule, applied from the next poll on."""
+        self.schedules.reset(target)
+        if schedule is None:
+            self.schedules.schedules.pop(target, None)
+        else:
+            self.schedules.schedules[target] = schedule
+        await self._schedule_store.async_save(
+            {
+                target: schedule.as_list()
+                for target, schedule in self.schedules.schedules.items()
+            }
+        )
+
+    async def async_burst_capture(self, capture: AcondBurstCapture, path: Path) -> None:
+        """Run a burst capture and export it, pausing the regular polls meanwhile."""
+        self.burst_capture = capture
+        update_interval, self.update_interval = self.update_interval, None
+        LOGGER.info("Burst capture of %s started", self.config_entry.title)
+        try:
+            await capture.async_run(self.config_entry.runtime_data.client)
+        finally:
+            self.burst_capture = None
+            self.update_interval = update_interval
+            await self.async_request_refresh()
+
+        await self.hass.async_add_executor_job(capture.write_csv, path)
+        LOGGER.info(
+            "Burst capture of %s written to %s: %s",
+            self.config_entry.title,
+            path,
+            capture.as_dict(),
+        )
+
+    @callback
+    def async_update_wanted_registers(self) -> None:
+        """Let the client skip pages that no enabled entity or feature needs."""
+        keys = set().union(*self._feature_registers.values())
+        registry = er.async_get(self.hass)
+        for entity in er.async_entries_for_config_entry(
+            registry, self.config_entry.entry_id
+        ):
+            if not entity.disabled:
+                keys.update(
+                    ACOND_ENTITY_REGISTERS.get(entity.unique_id, (entity.unique_id,))
+                )
+
+        client = self.config_entry.runtime_data.client
+        client.wanted_registers = frozenset(
+            ACOND_ACONOMIS_DATA_MAPPINGS[key]
+            for key in keys
+            if key in ACOND_ACONOMIS_DATA_MAPPINGS
+        )
+
+    @callback
+    def async_set_feature_registers(self, feature: str, keys: Iterable[str]) -> None:
+        """Declare the registers a feature needs, whichever entities are enabled."""
+        keys = frozenset(keys)
+        if self._feature_registers.get(feature) != keys:
+            self._feature_registers[feature] = keys
+            self.async_update_wanted_registers()
+
+    @callback
+    def async_entity_registry_updated(
+        self, event: Event[er.EventEntityRegistryUpdatedData]
+    ) -> None:
+        """Re-evaluate the wanted registers when an entity is enabled or disabled."""
+        if event.data["action"] == "update" and "disabled_by" not in event.data.get(
+            "changes", {}
+        ):
+            return
+
+        registry = er.async_get(self.hass)
+        entity = registry.async_get(event.data["entity_id"])
+        # Removed entities are no longer in the registry
+        if entity is None or entity.config_entry_id == self.config_entry.entry_id:
+            self.async_update_wanted_registers()
+
+    @callback
+    def _async_fire_transitions(self) -> None:
+        """Fire an event for every state that turned on or off since the last poll."""
+        events = self.transitions.update(
+            time.monotonic(),
+            {
+                "compressor": self.is_compressor_active(),
+                "defrost": self.is_defrost_active(),
+                "bivalence": self.is_bivalence_active(),
+                "dhw": self.is_dhw_active(),
+            },
+            self.get_power_consumption(),
+            self.get_heat_production(),
+        )
+
+        for event_type, payload in events:
+            self.hass.bus.async_fire(
+                event_type,
+                {"config_entry_id": self.config_entry.entry_id, **payload},
+            )
+
+            if event_type == EVENT_DEFROST_STARTED and self.burst_on_defrost:
+                capture, path = self.burst_on_defrost
+                self.burst_on_defrost = None
+                self.config_entry.async_create_background_task(
+                    self.hass,
+                    self.async_burst_capture(capture, path),
+                    "acond burst capture",
+                )
+
+    async def _async_apply_schedules(self, data: dict[str, Any]) -> None:
+        """Write the setpoints of the schedules after a poll."""
+        await self.schedules.async_apply(
+            self.config_entry.runtime_data.client, dt_util.now().time(), data
+        )
+
+    async def _async_store_sample(
+        self, samples: AcondSampleStore, timestamp: float, data: dict[str, Any]
+    ) -> None:
+        """Append a snapshot to the sample store."""
+        try:
+            await self.hass.async_add_executor_job(samples.append, timestamp, data)
+        except OSError as exception:
+            LOGGER.warning("Failed to store sample: %s", exception)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners, closing the profiled poll cycle if any."""
+        if self.last_update_success and self.data:
+            self._async_fire_transitions()
+            self.statistics.async_add(self.data)
+            if self.samples is not None:
+                self.config_entry.async_create_background_task(
+                    self.hass,
+                    self._async_store_sample(self.samples, time.time(), self.data),
+                    "acond sample store",
+                )
+            # Written outside the poll, a failed write never fails a poll.
+            # Writes still running from the previous poll are not repeated.
+            if self.schedules.schedules and (
+                self._schedule_task is None or self._schedule_task.done()
+            ):
+                self._schedule_task = self.config_entry.async_create_background_task(
+                    self.hass,
+                    self._async_apply_schedules(self.data),
+                    "acond setpoint schedules",
+                )
+
+        profiler = self.config_entry.runtime_data.client.memory_profiler
+        if profiler is None:
+            super().async_update_listeners()
+            return
+
+        with profiler.stage(STAGE_ENTITY_UPDATE):
+            super().async_update_listeners()
+
+        try:
+            profiler.check(profiler.end_cycle())
+        except AcondMemoryBudgetExceededError as exception:
+            LOGGER.warning("Poll cycle exceeded its memory budget: %s", exception)
 
     def get_regulation_mode(self) -> str | None:
         """Get current regulation mode."""
@@ -52,3 +314,27 @@ class AcondDataUpdateCoordinator(DataUpdateCoordinator):
         """Get whether domestic hot water is active."""
         key = ACOND_ACONOMIS_DATA_MAPPINGS["DHW_ACTIVE"]
         return self.data.get(key) if self.data else None
+
+    def is_defrost_active(self) -> bool | None:
+        """Get whether the heat pump is defrosting."""
+        key = ACOND_ACONOMIS_DATA_MAPPINGS["DEFROST_ACTIVE"]
+        return self.data.get(key) if self.data else None
+
+    def is_bivalence_active(self) -> bool | None:
+        """Get whether the bivalent heat source is active."""
+        key = ACOND_ACONOMIS_DATA_MAPPINGS["BIVALENCE_ACTIVE"]
+        return self.data.get(key) if self.data else None
+
+    def get_power_consumption(self) -> float | None:
+        """Get current electric power consumption in kW."""
+        key = ACOND_ACONOMIS_DATA_MAPPINGS["POWER_CONSUMPTION"]
+        return self.data.get(key) if self.data else None
+
+    def get_heat_production(self) -> float | None:
+        """Get current heat production in kW."""
+        key = ACOND_ACONOMIS_DATA_MAPPINGS["HEAT_PRODUCTION"]
+        return self.data.get(key) if self.data else None
+
+    def get_equitherm_curve(self) -> AcondEquithermCurve:
+        """Get the locally learned equitherm curve."""
+        return self.config_entry.runtime_data.client.equitherm_curve
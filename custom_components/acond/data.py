@@ -9,7 +9,7 @@ if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.loader import Integration
 
-    from .api import AcondApiClient
+    from .aconomis.api import AcondApiClient
     from .coordinator import AcondDataUpdateCoordinator
 
 
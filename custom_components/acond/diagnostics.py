@@ -0,0 +1,44 @@
+"""Diagnostics support for acond."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_IP_ADDRESS, CONF_PASSWORD, CONF_USERNAME
+
+from .aconomis.const import ACOND_ACONOMIS_DATA_MAPPINGS
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .data import AcondConfigEntry
+
+TO_REDACT = {CONF_IP_ADDRESS, CONF_PASSWORD, CONF_USERNAME, "MAC_ADDRESS"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant,  # noqa: ARG001 Unused function argument: `hass`
+    entry: AcondConfigEntry,
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    client = entry.runtime_data.client
+    data = entry.runtime_data.coordinator.data or {}
+    snapshot = {
+        key: data.get(register)
+        for key, register in ACOND_ACONOMIS_DATA_MAPPINGS.items()
+    }
+
+    return {
+        "config_entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "registers": client.register_catalog.as_dict(),
+        "requests": client.scheduler.as_dict(),
+        "latency": client.latency.as_dict(),
+        "skipped_pages": client.skipped_pages,
+        "schedules": entry.runtime_data.coordinator.schedules.as_dict(),
+        "memory": client.memory_profiler.as_dict()
+        if client.memory_profiler is not None
+        else None,
+        "trace": client.tracer.as_dict(),
+        "snapshot": async_redact_data(snapshot, TO_REDACT),
+    }
@@ -0,0 +1,121 @@
+"""Detection of state transitions between consecutive snapshots."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+EVENT_COMPRESSOR_STARTED = "acond_compressor_started"
+EVENT_COMPRESSOR_STOPPED = "acond_compressor_stopped"
+EVENT_DEFROST_STARTED = "acond_defrost_started"
+EVENT_DEFROST_ENDED = "acond_defrost_ended"
+EVENT_BIVALENCE_ENGAGED = "acond_bivalence_engaged"
+EVENT_BIVALENCE_DISENGAGED = "acond_bivalence_disengaged"
+EVENT_DHW_STARTED = "acond_dhw_started"
+EVENT_DHW_COMPLETED = "acond_dhw_completed"
+
+
+@dataclass(frozen=True, slots=True)
+class AcondTransition:
+    """Events fired when a state turns on and off again."""
+
+    state: str
+    on: str
+    off: str
+
+
+TRANSITIONS = (
+    AcondTransition("compressor", EVENT_COMPRESSOR_STARTED, EVENT_COMPRESSOR_STOPPED),
+    AcondTransition("defrost", EVENT_DEFROST_STARTED, EVENT_DEFROST_ENDED),
+    AcondTransition("bivalence", EVENT_BIVALENCE_ENGAGED, EVENT_BIVALENCE_DISENGAGED),
+    AcondTransition("dhw", EVENT_DHW_STARTED, EVENT_DHW_COMPLETED),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class _Phase:
+    """Where a state turned on."""
+
+    time: float
+    energy: float
+    heat: float
+
+
+class AcondTransitionDetector:
+    """
+    Detects states turning on and off between consecutive snapshots.
+
+    The electric energy and heat of a phase are integrated from the power
+    consumption and heat production of the snapshots, the energy totals of
+    the device only have a resolution of one kWh. Transitions are seen at
+    the poll interval, which bounds the precision of the durations.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the detector."""
+        self._states: dict[str, bool] = {}
+        self._phases: dict[str, _Phase] = {}
+        self._time: float | None = None
+        self._power = 0.0
+        self._heat_production = 0.0
+        # Integrated since the first snapshot, in kWh
+        self._energy = 0.0
+        self._heat = 0.0
+
+    def update(
+        self,
+        time: float,
+        states: dict[str, bool | None],
+        power: float | None,
+        heat_production: float | None,
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """Process a snapshot and return the events of its transitions."""
+        # Registers the device reported invalid values for are kept as strings
+        if not isinstance(power, int | float):
+            power = None
+        if not isinstance(heat_production, int | float):
+            heat_production = None
+
+        if self._time is not None:
+            hours = (time - self._time) / 3600
+            power = self._power if power is None else power
+            heat_production = (
+                self._heat_production if heat_production is None else heat_production
+            )
+            self._energy += (self._power + power) / 2 * hours
+            self._heat += (self._heat_production + heat_production) / 2 * hours
+        self._time = time
+        self._power = power or 0.0
+        self._heat_production = heat_production or 0.0
+
+        events: list[tuple[str, dict[str, Any]]] = []
+        for transition in TRANSITIONS:
+            state = states.get(transition.state)
+            if not isinstance(state, bool):
+                continue
+
+            previous = self._states.get(transition.state)
+            self._states[transition.state] = state
+            if previous is None or previous == state:
+                continue
+
+            if state:
+                self._phases[transition.state] = _Phase(time, self._energy, self._heat)
+                events.append((transition.on, {}))
+            elif (phase := self._phases.pop(transition.state, None)) is not None:
+                events.append((transition.off, self._summary(time, phase)))
+            else:
+                events.append((transition.off, {}))
+
+        return events
+
+    def _summary(self, time: float, phase: _Phase) -> dict[str, Any]:
+        """Return the duration, energy and heat of a phase that ended."""
+        energy = self._energy - phase.energy
+        heat = self._heat - phase.heat
+        return {
+            "duration": round(time - phase.time, 1),
+            "energy": round(energy, 3),
+            "heat": round(heat, 3),
+            "cop": round(heat / energy, 2) if energy > 0 else None,
+        }
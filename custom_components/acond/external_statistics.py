@@ -0,0 +1,202 @@
+"""Hourly long-term statistics imported directly into the recorder."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMeanType,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+from .aconomis.const import ACOND_ACONOMIS_DATA_MAPPINGS
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from homeassistant.core import HomeAssistant
+
+    from .data import AcondConfigEntry
+
+# Meters get a sum, measurements a mean
+STATISTIC_METER = "meter"
+STATISTIC_MEASUREMENT = "measurement"
+
+# Key, kind, unit and unit class of the imported statistics
+ACOND_STATISTICS = (
+    ("ENERGY_CONSUMPTION", STATISTIC_METER, "kWh", "energy"),
+    ("HEAT_QUANTITY", STATISTIC_METER, "kWh", "energy"),
+    ("COP", STATISTIC_MEASUREMENT, None, None),
+    ("INLET_TEMPERATURE", STATISTIC_MEASUREMENT, "°C", "temperature"),
+    ("OUTLET_TEMPERATURE", STATISTIC_MEASUREMENT, "°C", "temperature"),
+    ("OUTDOOR_TEMPERATURE", STATISTIC_MEASUREMENT, "°C", "temperature"),
+    ("DHW_TEMPERATURE", STATISTIC_MEASUREMENT, "°C", "temperature"),
+)
+
+
+@dataclass(slots=True)
+class _Accumulator:
+    """Running aggregates of a register over the current hour."""
+
+    count: int = 0
+    total: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+    last: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.last = value
+
+
+@dataclass(frozen=True, slots=True)
+class AcondHourlyStatistic:
+    """Aggregates of a register over a completed hour."""
+
+    key: str
+    start: datetime
+    mean: float
+    min: float
+    max: float
+    # Value at the end of the hour
+    state: float
+
+
+class AcondHourlyAggregator:
+    """Aggregates the polled registers per hour, in memory."""
+
+    def __init__(self, keys: tuple[str, ...]) -> None:
+        """Initialize the aggregator."""
+        self._keys = keys
+        self._start: datetime | None = None
+        self._hour: dict[str, _Accumulator] = {}
+
+    def add(self, now: datetime, data: dict[str, Any]) -> list[AcondHourlyStatistic]:
+        """Add a snapshot, returning the aggregates of the hour it completed."""
+        start = now.replace(minute=0, second=0, microsecond=0)
+        completed = []
+        if self._start is not None and start != self._start:
+            completed = [
+                AcondHourlyStatistic(
+                    key=key,
+                    start=self._start,
+                    mean=hour.total / hour.count,
+                    min=hour.minimum,
+                    max=hour.maximum,
+                    state=hour.last,
+                )
+                for key, hour in self._hour.items()
+            ]
+            self._hour = {}
+        self._start = start
+
+        for key in self._keys:
+            value = data.get(ACOND_ACONOMIS_DATA_MAPPINGS[key])
+            if isinstance(value, int | float) and not isinstance(value, bool):
+                self._hour.setdefault(key, _Accumulator()).add(float(value))
+
+        return completed
+
+
+class AcondStatisticsImporter:
+    """
+    Imports the hourly aggregates of a device as external statistics.
+
+    The aggregates are imported once per hour, when the hour completes, so
+    the states of the sensors do not need to be recorded for long-term
+    statistics. The hour Home Assistant stops in is not imported.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: AcondConfigEntry) -> None:
+        """Initialize the importer."""
+        self._hass = hass
+        self._entry = entry
+        self._aggregator = AcondHourlyAggregator(
+            tuple(key for key, *_ in ACOND_STATISTICS)
+        )
+        self._metadata = {
+            key: StatisticMetaData(
+                mean_type=StatisticMeanType.ARITHMETIC
+                if kind == STATISTIC_MEASUREMENT
+                else StatisticMeanType.NONE,
+                has_sum=kind == STATISTIC_METER,
+                name=f"{entry.title} {key.replace('_', ' ').capitalize()}",
+                source=DOMAIN,
+                statistic_id=f"{DOMAIN}:{entry.entry_id.lower()}_{key.lower()}",
+                unit_class=unit_class,
+                unit_of_measurement=unit,
+            )
+            for key, kind, unit, unit_class in ACOND_STATISTICS
+        }
+        # Last imported sum and state of every meter
+        self._meters: dict[str, tuple[float, float] | None] = {}
+
+    @callback
+    def async_add(self, data: dict[str, Any]) -> None:
+        """Add a snapshot, importing the hour it completed if any."""
+        completed = self._aggregator.add(dt_util.utcnow(), data)
+        if completed and "recorder" in self._hass.config.components:
+            self._entry.async_create_background_task(
+                self._hass,
+                self._async_import(completed),
+                "acond statistics import",
+            )
+
+    async def _async_import(self, completed: list[AcondHourlyStatistic]) -> None:
+        """Import the aggregates of a completed hour."""
+        for statistic in completed:
+            metadata = self._metadata[statistic.key]
+            row = StatisticData(start=statistic.start)
+            if metadata["has_sum"]:
+                row["state"] = statistic.state
+                row["sum"] = await self._async_meter_sum(statistic.key, statistic.state)
+            else:
+                row["mean"] = statistic.mean
+                row["min"] = statistic.min
+                row["max"] = statistic.max
+
+            async_add_external_statistics(self._hass, metadata, [row])
+
+    async def _async_meter_sum(self, key: str, state: float) -> float:
+        """Return the sum of a meter, continuing from the last imported one."""
+        if key not in self._meters:
+            statistic_id = self._metadata[key]["statistic_id"]
+            last = await get_instance(self._hass).async_add_executor_job(
+                get_last_statistics,
+                self._hass,
+                1,
+                statistic_id,
+                True,  # noqa: FBT003
+                {"sum", "state"},
+            )
+            rows = last.get(statistic_id)
+            self._meters[key] = (
+                (rows[0].get("sum") or 0.0, rows[0].get("state") or state)
+                if rows
+                else None
+            )
+
+        previous = self._meters[key]
+        if previous is None:
+            total = 0.0
+        else:
+            last_sum, last_state = previous
+            # A meter that went down was reset
+            total = last_sum + (state - last_state if state >= last_state else state)
+
+        self._meters[key] = (total, state)
+        return total
@@ -0,0 +1,209 @@
+"""OpenMetrics endpoint for acond."""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import web
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+
+from .aconomis.const import ACOND_ACONOMIS_DATA_MAPPINGS
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from homeassistant.core import HomeAssistant
+
+    from .data import AcondConfigEntry
+
+METRICS_URL = "/api/acond/metrics"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+INFO_KEYS = ("MAC_ADDRESS", "SOFTWARE_VERSION")
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _labels(**labels: str) -> str:
+    """Render a label set."""
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _number(value: Any) -> str | None:
+    """Render a sample value, or None if the value is not numeric."""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int | float):
+        value = float(value)
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return None
+
+
+class AcondMetricsRenderer:
+    """
+    Renders the latest snapshot of all devices in OpenMetrics text format.
+
+    The register families make up most of the output, they are cached and
+    only rebuilt when the snapshot of one of the devices changed. The
+    counters and gauges of the polls change without a new snapshot, for
+    example while polls fail, so they are rendered on every scrape.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the renderer."""
+        self._key: tuple[tuple[str, Any], ...] = ()
+        self._registers = b""
+
+    def render(self, entries: list[AcondConfigEntry]) -> bytes:
+        """Return the rendered metrics of the entries."""
+        key = tuple(
+            (entry.entry_id, entry.runtime_data.coordinator.data) for entry in entries
+        )
+        if len(key) != len(self._key) or any(
+            new[0] != old[0] or new[1] is not old[1]
+            for new, old in zip(key, self._key, strict=True)
+        ):
+            self._registers = "".join(self._register_lines(entries)).encode()
+            self._key = key
+
+        return self._registers + "".join(self._lines(entries)).encode()
+
+    def _register_lines(self, entries: list[AcondConfigEntry]) -> Iterator[str]:
+        """Render the register and device information families."""
+        yield "# TYPE acond_register gauge\n"
+        yield "# HELP acond_register Latest value of a mapped register.\n"
+        for entry in entries:
+            data = entry.runtime_data.coordinator.data or {}
+            for key, register in ACOND_ACONOMIS_DATA_MAPPINGS.items():
+                if (value := _number(data.get(register))) is not None:
+                    labels = _labels(entry=entry.title, register=key)
+                    yield f"acond_register{{{labels}}} {value}\n"
+
+        yield "# TYPE acond_device info\n"
+        yield "# HELP acond_device Device information.\n"
+        for entry in entries:
+            data = entry.runtime_data.coordinator.data or {}
+            info = {
+                key.lower(): str(data.get(ACOND_ACONOMIS_DATA_MAPPINGS[key], ""))
+                for key in INFO_KEYS
+            }
+            yield f"acond_device_info{{{_labels(entry=entry.title, **info)}}} 1\n"
+
+    def _lines(self, entries: list[AcondConfigEntry]) -> Iterator[str]:
+        """Render the other families, samples of a family are kept together."""
+        yield "# TYPE acond_up gauge\n"
+        yield "# HELP acond_up Whether the last poll of the device succeeded.\n"
+        for entry in entries:
+            coordinator = entry.runtime_data.coordinator
+            up = "1" if coordinator.last_update_success else "0"
+            yield f"acond_up{{{_labels(entry=entry.title)}}} {up}\n"
+
+        yield "# TYPE acond_polls counter\n"
+        yield "# HELP acond_polls Polls of the device.\n"
+        for entry in entries:
+            coordinator = entry.runtime_data.coordinator
+            for result, count in (
+                ("success", coordinator.polls - coordinator.poll_failures),
+                ("failure", coordinator.poll_failures),
+            ):
+                labels = _labels(entry=entry.title, result=result)
+                yield f"acond_polls_total{{{labels}}} {count}\n"
+
+        yield "# TYPE acond_poll_seconds counter\n"
+        yield "# UNIT acond_poll_seconds seconds\n"
+        yield "# HELP acond_poll_seconds Time spent polling the device.\n"
+        for entry in entries:
+            coordinator = entry.runtime_data.coordinator
+            labels = _labels(entry=entry.title)
+            yield f"acond_poll_seconds_total{{{labels}}} {coordinator.poll_time!r}\n"
+
+        yield "# TYPE acond_parse_seconds counter\n"
+        yield "# UNIT acond_parse_seconds seconds\n"
+        yield "# HELP acond_parse_seconds Time spent parsing pages.\n"
+        for entry in entries:
+            for page, stats in entry.runtime_data.client.parse_stats.items():
+                for where, seconds in (
+                    ("event_loop", stats.loop_time),
+                    ("executor", stats.executor_time),
+                ):
+                    labels = _labels(entry=entry.title, page=page, where=where)
+                    yield f"acond_parse_seconds_total{{{labels}}} {seconds!r}\n"
+
+        yield "# TYPE acond_request_queue_depth gauge\n"
+        yield "# HELP acond_request_queue_depth Requests waiting for the device.\n"
+        for entry in entries:
+            depth = entry.runtime_data.client.scheduler.depth
+            yield f"acond_request_queue_depth{{{_labels(entry=entry.title)}}} {depth}\n"
+
+        yield from self._latency_lines(entries)
+        yield from self._schedule_lines(entries)
+        yield "# EOF\n"
+
+    def _latency_lines(self, entries: list[AcondConfigEntry]) -> Iterator[str]:
+        """Render the learned latencies and request timeouts."""
+        yield "# TYPE acond_request_rtt_seconds gauge\n"
+        yield "# UNIT acond_request_rtt_seconds seconds\n"
+        yield "# HELP acond_request_rtt_seconds Smoothed round trip time of requests.\n"
+        for entry in entries:
+            latencies = entry.runtime_data.client.latency.as_dict()
+            for request, latency in latencies.items():
+                for estimate in ("srtt", "rttvar"):
+                    value = latency[estimate]
+                    labels = _labels(
+                        entry=entry.title, request=request, estimate=estimate
+                    )
+                    yield f"acond_request_rtt_seconds{{{labels}}} {value!r}\n"
+
+        yield "# TYPE acond_request_timeout_seconds gauge\n"
+        yield "# UNIT acond_request_timeout_seconds seconds\n"
+        yield "# HELP acond_request_timeout_seconds Timeout of the next request.\n"
+        for entry in entries:
+            latencies = entry.runtime_data.client.latency.as_dict()
+            for request, latency in latencies.items():
+                value = latency["timeout"]
+                labels = _labels(entry=entry.title, request=request)
+                yield f"acond_request_timeout_seconds{{{labels}}} {value!r}\n"
+
+    def _schedule_lines(self, entries: list[AcondConfigEntry]) -> Iterator[str]:
+        """Render the writes of the setpoint schedules."""
+        yield "# TYPE acond_schedule_writes counter\n"
+        yield "# HELP acond_schedule_writes Setpoint writes of the schedules.\n"
+        for entry in entries:
+            engine = entry.runtime_data.coordinator.schedules
+            for target, stats in engine.stats.items():
+                for result, count in (
+                    ("sent", stats.sent),
+                    ("skipped", stats.skipped),
+                    ("failed", stats.failed),
+                ):
+                    labels = _labels(entry=entry.title, target=target, result=result)
+                    yield f"acond_schedule_writes_total{{{labels}}} {count}\n"
+
+
+class AcondMetricsView(HomeAssistantView):
+    """Serves the metrics of all loaded acond devices."""
+
+    url = METRICS_URL
+    name = "api:acond:metrics"
+
+    def __init__(self) -> None:
+        """Initialize the view."""
+        self._renderer = AcondMetricsRenderer()
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the metrics."""
+        hass: HomeAssistant = request.app[KEY_HASS]
+        entries = hass.config_entries.async_loaded_entries(DOMAIN)
+        return web.Response(
+            body=self._renderer.render(entries),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
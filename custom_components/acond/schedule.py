@@ -0,0 +1,184 @@
+"""Time of use setpoint schedules."""
+
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass
+from datetime import time
+from typing import TYPE_CHECKING, Any
+
+from .aconomis.api import AcondApiClientError
+from .aconomis.const import ACOND_ACONOMIS_DATA_MAPPINGS
+from .const import LOGGER
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from .aconomis.api import AcondApiClient
+
+SCHEDULE_DHW = "dhw"
+SCHEDULE_HEATING = "heating"
+
+# Register a schedule writes, compared against the latest snapshot
+SCHEDULE_REGISTERS = {
+    SCHEDULE_DHW: "SET_DHW_TEMPERATURE_REQUIRED",
+    SCHEDULE_HEATING: "SET_HEATING_TEMPERATURE_REQUIRED",
+}
+
+# Setpoints the entities of the targets accept
+SCHEDULE_LIMITS = {
+    SCHEDULE_DHW: (10.0, 56.0),
+    SCHEDULE_HEATING: (10.0, 60.0),
+}
+
+# Setpoints are written with one decimal
+SETPOINT_RESOLUTION = 0.05
+
+# Writes of the setpoint of a slot before it is left to the device
+SCHEDULE_WRITE_ATTEMPTS = 3
+
+
+@dataclass(frozen=True, slots=True)
+class AcondScheduleSlot:
+    """A setpoint that applies from its start until the next slot."""
+
+    start: time
+    temperature: float
+
+
+class AcondSetpointSchedule:
+    """Daily schedule of setpoints, the last slot continues past midnight."""
+
+    def __init__(self, slots: list[AcondScheduleSlot]) -> None:
+        """Initialize the schedule."""
+        self.slots = sorted(slots, key=lambda slot: slot.start)
+        self._starts = [slot.start for slot in self.slots]
+
+    def slot(self, now: time) -> AcondScheduleSlot:
+        """Return the slot active at a time of day."""
+        return self.slots[bisect.bisect_right(self._starts, now) - 1]
+
+    def target(self, now: time) -> float:
+        """Return the setpoint at a time of day."""
+        return self.slot(now).temperature
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return the slots for storage."""
+        return [
+            {"start": slot.start.isoformat(), "temperature": slot.temperature}
+            for slot in self.slots
+        ]
+
+    @classmethod
+    def from_list(cls, slots: list[dict[str, Any]]) -> AcondSetpointSchedule:
+        """Restore a schedule from storage."""
+        return cls(
+            [
+                AcondScheduleSlot(
+                    time.fromisoformat(slot["start"]), slot["temperature"]
+                )
+                for slot in slots
+            ]
+        )
+
+
+@dataclass
+class AcondScheduleStats:
+    """Writes of a schedule."""
+
+    sent: int = 0
+    # Poll cycles without a write, the setpoint of the slot was settled
+    skipped: int = 0
+    failed: int = 0
+
+
+class AcondScheduleEngine:
+    """
+    Applies the setpoint schedules of a device when their slots start.
+
+    When a slot becomes active its setpoint is written, unless the device
+    already holds it. The next regular poll reads the write back, no extra
+    request is needed for it, and the write is repeated until the device
+    holds the setpoint, at most SCHEDULE_WRITE_ATTEMPTS times. The setpoint
+    is then settled for the rest of the slot: a change made on an entity is
+    kept until the next slot starts, and a device that clamps or rounds the
+    setpoint is not written to on every poll.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the engine."""
+        self.schedules: dict[str, AcondSetpointSchedule] = {}
+        self.stats = {target: AcondScheduleStats() for target in SCHEDULE_REGISTERS}
+        # Slot of every target whose setpoint is settled, and the slot with
+        # the writes made so far of every target whose setpoint is not yet
+        self._settled: dict[str, AcondScheduleSlot] = {}
+        self._pending: dict[str, tuple[AcondScheduleSlot, int]] = {}
+
+    def reset(self, target: str) -> None:
+        """Apply the schedule of a target again, after it was replaced."""
+        self._settled.pop(target, None)
+        self._pending.pop(target, None)
+
+    async def async_apply(
+        self, client: AcondApiClient, now: time, data: dict[str, Any]
+    ) -> None:
+        """Write the setpoints of the slots that started and are not settled yet."""
+        writers: dict[str, Callable[[float], Awaitable[None]]] = {
+            SCHEDULE_DHW: client.async_set_dhw_temperature,
+            SCHEDULE_HEATING: client.async_set_heating_temperature,
+        }
+
+        for target, schedule in self.schedules.items():
+            slot = schedule.slot(now)
+            stats = self.stats[target]
+            if self._settled.get(target) == slot:
+                stats.skipped += 1
+                continue
+
+            current = data.get(ACOND_ACONOMIS_DATA_MAPPINGS[SCHEDULE_REGISTERS[target]])
+            pending, attempts = self._pending.get(target, (slot, 0))
+            if pending != slot:
+                attempts = 0
+
+            held = (
+                isinstance(current, int | float)
+                and not isinstance(current, bool)
+                and abs(current - slot.temperature) < SETPOINT_RESOLUTION
+            )
+            if held or attempts >= SCHEDULE_WRITE_ATTEMPTS:
+                if not held:
+                    LOGGER.warning(
+                        "Device holds %s instead of the %s setpoint %s after %d "
+                        "writes, leaving it until the next slot",
+                        current,
+                        target,
+                        slot.temperature,
+                        attempts,
+                    )
+                self._settled[target] = slot
+                self._pending.pop(target, None)
+                stats.skipped += 1
+                continue
+
+            self._pending[target] = (slot, attempts + 1)
+            try:
+                await writers[target](slot.temperature)
+            except AcondApiClientError as exception:
+                stats.failed += 1
+                LOGGER.warning("Failed to apply %s schedule: %s", target, exception)
+            else:
+                stats.sent += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the schedules and their writes."""
+        return {
+            target: {
+                "slots": self.schedules[target].as_list()
+                if target in self.schedules
+                else None,
+                "sent": stats.sent,
+                "skipped": stats.skipped,
+                "failed": stats.failed,
+            }
+            for target, stats in self.stats.items()
+        }
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -12,7 +12,7 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.const import EntityCategory
 
-from .const import (
+from .aconomis.const import (
     ACOND_ACONOMIS_DATA_MAPPINGS,
     AcondOperatingMode,
     AcondRegulationMode,
@@ -216,6 +216,10 @@ async def async_setup_entry(
 class AcondSensor(AcondEntity, SensorEntity):
     """Acond Sensor class."""
 
+    # The points of the learned equitherm curve keep growing, they are
+    # only kept in the state, not written to the recorder on every change
+    _unrecorded_attributes = frozenset({"curve"})
+
     def __init__(
         self,
         coordinator: AcondDataUpdateCoordinator,
@@ -240,3 +244,12 @@ class AcondSensor(AcondEntity, SensorEntity):
                 value = AcondSeasonMode.SUMMER if value else AcondSeasonMode.WINTER
 
         return value
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the state attributes of the sensor."""
+        match self.entity_description.key:
+            case "EQUITHERM_TARGET_RETURN_WATER_TEMPERATURE":
+                return {"curve": self.coordinator.get_equitherm_curve().points}
+
+        return None
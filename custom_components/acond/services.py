@@ -0,0 +1,345 @@
+"""Services for acond."""
+
+from __future__ import annotations
+
+import math
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import ServiceCall, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .aconomis.profiling import AcondMemoryProfiler
+from .aconomis.recording import AcondSessionRecorder
+from .burst import BURST_DURATION, BURST_INTERVAL, BURST_KEYS, AcondBurstCapture
+from .const import DOMAIN, LOGGER
+from .schedule import (
+    SCHEDULE_LIMITS,
+    SCHEDULE_REGISTERS,
+    AcondScheduleSlot,
+    AcondSetpointSchedule,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant, ServiceResponse
+
+    from .data import AcondConfigEntry
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_DURATION = "duration"
+ATTR_INTERVAL = "interval"
+ATTR_WAIT_FOR_DEFROST = "wait_for_defrost"
+ATTR_TARGET = "target"
+ATTR_SLOTS = "slots"
+ATTR_START = "start"
+ATTR_TEMPERATURE = "temperature"
+ATTR_START_TIME = "start_time"
+ATTR_END_TIME = "end_time"
+ATTR_REGISTERS = "registers"
+
+SERVICE_START_RECORDING = "start_recording"
+SERVICE_STOP_RECORDING = "stop_recording"
+SERVICE_START_MEMORY_PROFILING = "start_memory_profiling"
+SERVICE_STOP_MEMORY_PROFILING = "stop_memory_profiling"
+SERVICE_START_BURST_CAPTURE = "start_burst_capture"
+SERVICE_SET_SCHEDULE = "set_schedule"
+SERVICE_CLEAR_SCHEDULE = "clear_schedule"
+SERVICE_QUERY_SAMPLES = "query_samples"
+
+# Values a sample query returns at most, samples times registers
+QUERY_SAMPLES_LIMIT = 100_000
+
+SERVICE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+BURST_CAPTURE_SCHEMA = SERVICE_SCHEMA.extend(
+    {
+        vol.Optional(ATTR_DURATION, default=BURST_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=10, max=3600)
+        ),
+        vol.Optional(ATTR_INTERVAL, default=BURST_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=0.5, max=60)
+        ),
+        vol.Optional(ATTR_WAIT_FOR_DEFROST, default=False): cv.boolean,
+    }
+)
+
+CLEAR_SCHEDULE_SCHEMA = SERVICE_SCHEMA.extend(
+    {
+        vol.Required(ATTR_TARGET): vol.In(SCHEDULE_REGISTERS),
+    }
+)
+
+SET_SCHEDULE_SCHEMA = CLEAR_SCHEDULE_SCHEMA.extend(
+    {
+        vol.Required(ATTR_SLOTS): vol.All(
+            cv.ensure_list,
+            vol.Length(min=1),
+            [
+                vol.Schema(
+                    {
+                        vol.Required(ATTR_START): cv.time,
+                        vol.Required(ATTR_TEMPERATURE): vol.Coerce(float),
+                    }
+                )
+            ],
+        ),
+    }
+)
+
+QUERY_SAMPLES_SCHEMA = SERVICE_SCHEMA.extend(
+    {
+        vol.Required(ATTR_START_TIME): cv.datetime,
+        vol.Optional(ATTR_END_TIME): cv.datetime,
+        vol.Optional(ATTR_REGISTERS): vol.All(
+            cv.ensure_list, [vol.All(cv.string, vol.Upper, vol.In(BURST_KEYS))]
+        ),
+    }
+)
+
+
+def _get_entry(hass: HomeAssistant, call: ServiceCall) -> AcondConfigEntry:
+    """Get the loaded config entry a service call is for."""
+    entry = hass.config_entries.async_get_entry(call.data[ATTR_CONFIG_ENTRY_ID])
+    if entry is None or entry.domain != DOMAIN:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="entry_not_found",
+        )
+    if entry.state is not ConfigEntryState.LOADED:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="entry_not_loaded",
+        )
+    return entry
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Set up the services for acond."""
+
+    async def async_start_recording(call: ServiceCall) -> ServiceResponse:
+        """Start recording the exchanges with a device."""
+        entry = _get_entry(hass, call)
+        client = entry.runtime_data.client
+
+        if client.recorder is None:
+            timestamp = dt_util.utcnow().strftime("%Y%m%d%H%M%S")
+            path = Path(
+                hass.config.path(
+                    DOMAIN, "recordings", f"{entry.entry_id}_{timestamp}.jsonl"
+                )
+            )
+            await hass.async_add_executor_job(
+                partial(path.parent.mkdir, parents=True, exist_ok=True)
+            )
+            # Another call may have started a recording meanwhile
+            if client.recorder is None:
+                client.start_recording(AcondSessionRecorder(path))
+                LOGGER.info("Recording exchanges with %s to %s", entry.title, path)
+
+        return {"path": str(client.recorder.path)}
+
+    async def async_stop_recording(call: ServiceCall) -> ServiceResponse:
+        """Stop recording the exchanges with a device."""
+        entry = _get_entry(hass, call)
+        recorder = await entry.runtime_data.client.async_stop_recording()
+        if recorder is None:
+            return {}
+
+        return {"path": str(recorder.path), "exchanges": recorder.exchanges}
+
+    async def async_start_memory_profiling(call: ServiceCall) -> None:
+        """Start profiling the memory allocated per poll cycle."""
+        client = _get_entry(hass, call).runtime_data.client
+        if client.memory_profiler is None:
+            client.memory_profiler = AcondMemoryProfiler()
+            client.memory_profiler.start()
+
+    async def async_stop_memory_profiling(call: ServiceCall) -> ServiceResponse:
+        """Stop profiling and return the allocations per stage."""
+        client = _get_entry(hass, call).runtime_data.client
+        profiler, client.memory_profiler = client.memory_profiler, None
+        if profiler is None:
+            return {}
+
+        profiler.stop()
+        return profiler.as_dict()
+
+    async def async_start_burst_capture(call: ServiceCall) -> ServiceResponse:
+        """Sample the measurement page at a high rate for a while."""
+        entry = _get_entry(hass, call)
+        coordinator = entry.runtime_data.coordinator
+        timestamp = dt_util.utcnow().strftime("%Y%m%d%H%M%S")
+        path = Path(
+            hass.config.path(DOMAIN, "bursts", f"{entry.entry_id}_{timestamp}.csv")
+        )
+        await hass.async_add_executor_job(
+            partial(path.parent.mkdir, parents=True, exist_ok=True)
+        )
+
+        if (
+            coordinator.burst_capture is not None
+            or coordinator.burst_on_defrost is not None
+        ):
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="burst_capture_running",
+            )
+
+        capture = AcondBurstCapture(call.data[ATTR_DURATION], call.data[ATTR_INTERVAL])
+        if call.data[ATTR_WAIT_FOR_DEFROST]:
+            coordinator.burst_on_defrost = (capture, path)
+        else:
+            entry.async_create_background_task(
+                hass,
+                coordinator.async_burst_capture(capture, path),
+                "acond burst capture",
+            )
+
+        return {"path": str(path), "samples": capture.capacity}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_RECORDING,
+        async_start_recording,
+        schema=SERVICE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_RECORDING,
+        async_stop_recording,
+        schema=SERVICE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_MEMORY_PROFILING,
+        async_start_memory_profiling,
+        schema=SERVICE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_MEMORY_PROFILING,
+        async_stop_memory_profiling,
+        schema=SERVICE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_BURST_CAPTURE,
+        async_start_burst_capture,
+        schema=BURST_CAPTURE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    _async_setup_schedule_services(hass)
+    _async_setup_sample_services(hass)
+
+
+def _async_setup_schedule_services(hass: HomeAssistant) -> None:
+    """Set up the setpoint schedule services."""
+
+    async def async_set_schedule(call: ServiceCall) -> None:
+        """Replace the setpoint schedule of a device."""
+        entry = _get_entry(hass, call)
+        target = call.data[ATTR_TARGET]
+        minimum, maximum = SCHEDULE_LIMITS[target]
+        slots = [
+            AcondScheduleSlot(slot[ATTR_START], slot[ATTR_TEMPERATURE])
+            for slot in call.data[ATTR_SLOTS]
+        ]
+        if any(not minimum <= slot.temperature <= maximum for slot in slots):
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="schedule_temperature_out_of_range",
+                translation_placeholders={"min": str(minimum), "max": str(maximum)},
+            )
+        if len({slot.start for slot in slots}) != len(slots):
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="schedule_duplicate_start",
+            )
+
+        await entry.runtime_data.coordinator.async_set_schedule(
+            target, AcondSetpointSchedule(slots)
+        )
+
+    async def async_clear_schedule(call: ServiceCall) -> None:
+        """Remove the setpoint schedule of a device."""
+        entry = _get_entry(hass, call)
+        await entry.runtime_data.coordinator.async_set_schedule(
+            call.data[ATTR_TARGET], None
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_SCHEDULE,
+        async_set_schedule,
+        schema=SET_SCHEDULE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CLEAR_SCHEDULE,
+        async_clear_schedule,
+        schema=CLEAR_SCHEDULE_SCHEMA,
+    )
+
+
+def _async_setup_sample_services(hass: HomeAssistant) -> None:
+    """Set up the raw sample services."""
+
+    async def async_query_samples(call: ServiceCall) -> ServiceResponse:
+        """Return the raw samples of a device over a time range."""
+        entry = _get_entry(hass, call)
+        samples = entry.runtime_data.coordinator.samples
+        if samples is None:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="samples_not_stored",
+            )
+
+        start = dt_util.as_utc(call.data[ATTR_START_TIME]).timestamp()
+        end = dt_util.as_utc(
+            call.data.get(ATTR_END_TIME) or dt_util.utcnow()
+        ).timestamp()
+        keys = tuple(call.data.get(ATTR_REGISTERS) or ()) or samples.keys
+
+        count = await hass.async_add_executor_job(samples.count, start, end)
+        if count * len(keys) > QUERY_SAMPLES_LIMIT:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="too_many_samples",
+                translation_placeholders={
+                    "count": str(count * len(keys)),
+                    "limit": str(QUERY_SAMPLES_LIMIT),
+                },
+            )
+
+        columns = await hass.async_add_executor_job(samples.query, start, end, keys)
+        times = columns.pop("TIME")
+        return {
+            "time": [
+                dt_util.utc_from_timestamp(timestamp).isoformat() for timestamp in times
+            ],
+            "registers": {
+                key.lower(): [None if math.isnan(value) else value for value in column]
+                for key, column in columns.items()
+            },
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_SAMPLES,
+        async_query_samples,
+        schema=QUERY_SAMPLES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
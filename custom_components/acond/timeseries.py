@@ -0,0 +1,220 @@
+"""On-disk store of the raw register samples of a device."""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import math
+import mmap
+import struct
+import threading
+from array import array
+from datetime import UTC, date, datetime, timedelta
+from typing import IO, TYPE_CHECKING, Any
+
+from .aconomis.const import ACOND_ACONOMIS_DATA_MAPPINGS
+from .burst import BURST_KEYS
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+SAMPLE_RETENTION_DAYS = 14
+
+SEGMENT_SUFFIX = ".bin"
+SEGMENT_MAGIC = b"ACONDTS1"
+# Magic, header size and column count, followed by the column names
+_HEADER = struct.Struct("<8sII")
+_ITEM_SIZE = array("d").itemsize
+
+
+def _segment_day(timestamp: float) -> date:
+    """Return the day of the segment a sample belongs to."""
+    return datetime.fromtimestamp(timestamp, UTC).date()
+
+
+class AcondSampleSegment:
+    """
+    A day of samples, memory mapped for reading.
+
+    Columns are strided views into the mapping, nothing is copied until the
+    values are used. A record cut short by a crash is ignored.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Map a segment."""
+        with path.open("rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_size, count = (
+            _HEADER.unpack_from(self._mmap)
+            if len(self._mmap) >= _HEADER.size
+            else (b"", 0, 0)
+        )
+        if magic != SEGMENT_MAGIC:
+            self._mmap.close()
+            msg = f"{path} is not a sample segment"
+            raise ValueError(msg)
+
+        names = self._mmap[_HEADER.size : header_size].rstrip(b"\0")
+        self.keys = ("TIME", *names.decode("ascii").split("\0"))
+        record_size = (count + 1) * _ITEM_SIZE
+        self.length = (len(self._mmap) - header_size) // record_size
+        # Size of the segment up to the last complete record
+        self.size = header_size + self.length * record_size
+        self._values = memoryview(self._mmap)[header_size : self.size].cast("d")
+
+    def column(self, key: str) -> memoryview:
+        """Return a view of a column, TIME for the sample timestamps."""
+        return self._values[self.keys.index(key) :: len(self.keys)]
+
+    def rows(self, start: float, end: float) -> slice:
+        """Return the rows sampled from start up to but excluding end."""
+        times = self.column("TIME")
+        return slice(bisect.bisect_left(times, start), bisect.bisect_left(times, end))
+
+    def close(self) -> None:
+        """Unmap the segment, views of its columns must not be used anymore."""
+        self._values.release()
+        self._mmap.close()
+
+
+class AcondSampleStore:
+    """
+    Append-only store of the numeric registers of every poll.
+
+    Every sample is a fixed size record of doubles appended to the segment
+    of its UTC day, missing registers are stored as NaN. Segments older than
+    the retention are deleted when a new day starts. All methods do blocking
+    I/O and have to run in an executor.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        keys: tuple[str, ...] = BURST_KEYS,
+        retention_days: int = SAMPLE_RETENTION_DAYS,
+    ) -> None:
+        """Initialize the store."""
+        self.directory = directory
+        self.keys = keys
+        self.retention = timedelta(days=retention_days)
+        self._registers = tuple(ACOND_ACONOMIS_DATA_MAPPINGS[key] for key in keys)
+        self._record = array("d", [math.nan]) * (len(keys) + 1)
+        self._day: date | None = None
+        self._file: IO[bytes] | None = None
+        self._lock = threading.Lock()
+
+    def append(self, timestamp: float, data: dict[str, Any]) -> None:
+        """Append a sample, booleans are stored as 0 and 1."""
+        with self._lock:
+            record = self._record
+            record[0] = timestamp
+            for index, register in enumerate(self._registers, 1):
+                value = data.get(register)
+                record[index] = value if isinstance(value, int | float) else math.nan
+
+            day = _segment_day(timestamp)
+            if self._file is None or day != self._day:
+                self._open(day)
+            if self._file is not None:
+                self._file.write(record.tobytes())
+
+    def _open(self, day: date) -> None:
+        """Start appending to the segment of a day."""
+        self._close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(day)
+
+        if path.exists():
+            try:
+                segment = AcondSampleSegment(path)
+            except ValueError:
+                segment = None
+
+            # A segment written with other columns is set aside, one cut
+            # short by a crash is continued after its last complete record
+            if segment is None or segment.keys[1:] != self.keys:
+                path.replace(path.with_suffix(".old"))
+            else:
+                segment.close()
+                with path.open("r+b") as file:
+                    file.truncate(segment.size)
+
+        self._file = path.open("ab", buffering=0)
+        if self._file.tell() == 0:
+            names = "\0".join(self.keys).encode("ascii")
+            header_size = _HEADER.size + len(names)
+            header_size += -header_size % _ITEM_SIZE
+            self._file.write(
+                _HEADER.pack(SEGMENT_MAGIC, header_size, len(self.keys))
+                + names.ljust(header_size - _HEADER.size, b"\0")
+            )
+
+        self._day = day
+        self._prune(day)
+
+    def _prune(self, today: date) -> None:
+        """Delete the segments older than the retention."""
+        oldest = (today - self.retention).isoformat()
+        for path in self.directory.iterdir():
+            if path.stem < oldest:
+                path.unlink(missing_ok=True)
+
+    def _path(self, day: date) -> Path:
+        """Return the path of the segment of a day."""
+        return self.directory / f"{day.isoformat()}{SEGMENT_SUFFIX}"
+
+    @contextlib.contextmanager
+    def segments(self, start: float, end: float) -> Iterator[list[AcondSampleSegment]]:
+        """Map the segments with samples between start and end."""
+        day, last = _segment_day(start), _segment_day(end)
+        mapped = []
+        try:
+            while day <= last:
+                path = self._path(day)
+                # Empty and foreign files are skipped
+                with contextlib.suppress(ValueError):
+                    if path.exists():
+                        mapped.append(AcondSampleSegment(path))
+                day += timedelta(days=1)
+            yield mapped
+        finally:
+            for segment in mapped:
+                segment.close()
+
+    def count(self, start: float, end: float) -> int:
+        """Return the number of samples from start up to but excluding end."""
+        with self.segments(start, end) as segments:
+            return sum(
+                rows.stop - rows.start
+                for rows in (segment.rows(start, end) for segment in segments)
+            )
+
+    def query(
+        self, start: float, end: float, keys: tuple[str, ...] | None = None
+    ) -> dict[str, array[float]]:
+        """Return the columns of the samples from start up to but excluding end."""
+        keys = keys or self.keys
+        columns = {key: array("d") for key in ("TIME", *keys)}
+        with self.segments(start, end) as segments:
+            for segment in segments:
+                rows = segment.rows(start, end)
+                for key, column in columns.items():
+                    if key in segment.keys:
+                        column.extend(segment.column(key)[rows])
+                    else:
+                        column.extend([math.nan] * (rows.stop - rows.start))
+
+        return columns
+
+    def close(self) -> None:
+        """Close the segment appended to."""
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        """Close the segment appended to, with the lock held."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -15,7 +15,7 @@ from homeassistant.const import (
     UnitOfTemperature,
 )
 
-from .const import ACOND_ACONOMIS_DATA_MAPPINGS
+from .aconomis.const import ACOND_ACONOMIS_DATA_MAPPINGS
 from .data import AcondConfigEntry
 from .entity import AcondEntity
 
@@ -0,0 +1,86 @@
+"""
+Benchmark the page decoders of the Acond API client.
+
+Compares the BeautifulSoup based _map_response with the byte-level
+extractor and the layout-learning extractor on synthetic pages.
+
+Usage: python3 scripts/benchmark.py [--filler N] [--polls N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from typing import TYPE_CHECKING
+
+import standalone  # noqa: F401 Puts the aconomis package on the path
+from aconomis.api import AcondApiClient
+from aconomis.parser import PageLayout, detect_encoding, extract_inputs
+from aconomis.registers import AcondRegisterCatalog
+from sample_pages import FILLER_REGISTERS, register_names, render_page
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def _measure(decode: Callable[[bytes], object], pages: list[bytes]) -> float:
+    """Return the average time in seconds to decode a page."""
+    start = time.perf_counter()
+    for page in pages:
+        decode(page)
+    return (time.perf_counter() - start) / len(pages)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filler", type=int, default=FILLER_REGISTERS)
+    parser.add_argument("--polls", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    names = register_names(args.filler)
+    pages = [render_page(names, rng) for _ in range(args.polls)]
+    encoding = detect_encoding(pages[0])
+
+    layout = PageLayout.learn(pages[0], encoding)
+    if layout is None:
+        sys.exit("Unable to learn the layout of the sample page")
+
+    # _map_response only needs the register catalog
+    client = AcondApiClient.__new__(AcondApiClient)
+    client._register_catalog = catalog = AcondRegisterCatalog()  # noqa: SLF001
+
+    def layout_decode(page: bytes) -> object:
+        inputs = layout.extract(page, encoding)
+        return catalog.decode_inputs(inputs if inputs is not None else [])
+
+    decoders = {
+        "_map_response": lambda page: client._map_response(  # noqa: SLF001
+            page.decode(encoding)
+        ),
+        "extract_inputs": lambda page: catalog.decode_inputs(
+            extract_inputs(page, encoding)
+        ),
+        "PageLayout": layout_decode,
+    }
+
+    expected = [decoders["_map_response"](page) for page in pages]
+    for label, decode in decoders.items():
+        if [decode(page) for page in pages] != expected:
+            sys.exit(f"{label} does not match _map_response")
+
+    print(f"{len(names)} registers, {len(pages[0])} bytes per page")
+    baseline = None
+    for label, decode in decoders.items():
+        duration = _measure(decode, pages)
+        baseline = baseline or duration
+        print(
+            f"{label:>16}: {duration * 1e6:9.1f} us/page ({baseline / duration:5.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
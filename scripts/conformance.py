@@ -0,0 +1,783 @@
+"""
+Check the page decoders of the Acond API client against _map_response.
+
+The reference is a frozen copy of the BeautifulSoup based _map_response
+as it was before the register catalog, with its suffix rules. A decoder
+has to return exactly what the reference returns, value types included,
+apart from the differences listed in intended(). The corpus holds the
+polled pages of recorded sessions, synthetic pages, hand written edge
+cases and fuzzed variants of all of them. Fuzzed pages are mostly not
+well-formed, where the decoders recover differently from BeautifulSoup.
+Every difference on them has to be one of the cases of accepted(), with
+the output it expects, a single unexplained one fails the run.
+
+Throughput is measured relative to the reference, which keeps the gate
+independent of the machine. The decoders that replace the reference have
+to be at least as fast as it. The baseline, conformance_baseline.json
+next to this script unless --baseline names another, fails a decoder
+that lost more than --tolerance of its speedup. --save-baseline stores
+the results of a run.
+
+Usage: python3 scripts/conformance.py [--recording FILE ...] [--fuzz N]
+           [--seed N] [--baseline FILE] [--save-baseline FILE]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import html
+import itertools
+import json
+import random
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from xml.sax.saxutils import quoteattr
+
+import standalone  # noqa: F401 Puts the aconomis package on the path
+from aconomis.api import POLL_PAGES, AcondApiClient
+from aconomis.parser import detect_encoding, extract_inputs
+from aconomis.recording import AcondReplaySession, read_recording
+from aconomis.registers import AcondRegisterCatalog
+from bs4 import BeautifulSoup
+from sample_pages import PAGE_FOOTER, PAGE_HEADER, register_names, render_page
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    Decoder = Callable[["CorpusPage"], Any]
+
+REFERENCE = "_map_response"
+DEFAULT_BASELINE = Path(__file__).with_name("conformance_baseline.json")
+DEFAULT_FUZZ = 500
+DEFAULT_TOLERANCE = 0.2
+# Decoders that replace the reference, each has to be at least as fast
+FAST_PATHS = ("extract_inputs", "_decode_page")
+MIN_SPEEDUP = 1.0
+# Passes over the corpus when measuring throughput, the fastest one counts
+THROUGHPUT_RUNS = 3
+
+# Values that exercise the decoders of the register types
+EDGE_VALUES = (
+    "0", "0.0", "-0.0", "0.00", "1", "-1", "2", "+3", " 4 ", "5 ", "1e3", "1E-3",
+    "1e400", "-1e400", "nan", "NaN", "inf", "-Infinity", "0x10", "1_000", "",
+    " ", "abc", "None", "true", "False", "256", "-129", "65536", "१२",
+    "&amp;", "&lt;5&gt;", "&#65;&#x42;", "&quot;quoted&quot;", "ěščřžýáíé",
+)  # fmt: skip
+# Every value gets a register of its own, formatted in by its number
+EDGE_REGISTERS = (
+    "__T{:08X}_REAL_.1f",
+    "__T{:08X}_LREAL_.3f",
+    "__T{:08X}_BOOL_i",
+    "__T{:08X}_USINT_u",
+    "__T{:08X}_SINT_i",
+    "__T{:08X}_INT_i",
+    "__T{:08X}_UDINT_u",
+    "__T{:08X}_STRING[4]_s",
+    "__T{:08X}_STRING[20]_s",
+    "__T{:08X}_TIME_t",
+    "LEGACY{}_TEMPERATURE_f",
+    "LEGACY{}_LEVEL_USINT_u",
+    "LEGACY{}_FLAG_BOOL_i",
+    "UNTYPED{}",
+)
+EDGE_TAGS = (
+    '<INPUT NAME="__T00000001_REAL_.1f">',
+    '<INPUT VALUE="12.5">',
+    "<INPUT>",
+    "<INPUT/>",
+    '<INPUT VALUE="1" NAME="__T00000001_REAL_.1f">',
+    "<INPUT NAME='__T00000003_BOOL_i' VALUE='1'>",
+    '<INPUT NAME = "__T00000004_USINT_u" VALUE = "7">',
+    '<INPUT ID="x" NAME="__T00000006_INT_i" TYPE="hidden" VALUE="-3"/>',
+    '<INPUT NAME="__T00000009_STRING[20]_s" VALUE="a > b">',
+    '<INPUT NAME="__T00000009_STRING[20]_s" VALUE="line\nbreak">',
+    '<INPUT NAME="__T00000009_STRING[20]_s" VALUE="tab\there">',
+    '<INPUT NAME="__T00000001_REAL_.1f" VALUE="1.0"><INPUT NAME="__T00000001_REAL_.1f"'
+    ' VALUE="2.0">',
+    "<!-- <INPUT NAME='__T00000004_USINT_u' VALUE='9'> -->",
+    "<![CDATA[<INPUT NAME='__T00000004_USINT_u' VALUE='9'>]]>",
+)
+EDGE_ENCODINGS = ("utf-8", "windows-1250", "iso-8859-2")
+
+REAL_TYPES = ("REAL", "LREAL")
+# Ranges of the integer types the register catalog validates
+INTEGER_RANGES = {
+    "SINT": (-(2**7), 2**7 - 1),
+    "USINT": (0, 2**8 - 1),
+    "BYTE": (0, 2**8 - 1),
+    "INT": (-(2**15), 2**15 - 1),
+    "UINT": (0, 2**16 - 1),
+    "WORD": (0, 2**16 - 1),
+    "DINT": (-(2**31), 2**31 - 1),
+    "UDINT": (0, 2**32 - 1),
+    "DWORD": (0, 2**32 - 1),
+    "LINT": (-(2**63), 2**63 - 1),
+    "ULINT": (0, 2**64 - 1),
+    "LWORD": (0, 2**64 - 1),
+}
+TYPED_NAME = re.compile(r"^__T[0-9A-F]+_(?P<type>[A-Z]+)(?:\[\d+\])?_(?P<format>.+)$")
+FLOAT_FORMAT = re.compile(r"^\.(?P<precision>\d+)f$")
+KNOWN_TYPES = frozenset((*REAL_TYPES, "BOOL", "STRING", *INTEGER_RANGES))
+# Types of the names without a known one, by the suffix rules of the reference
+LEGACY_TYPES = (("f", "REAL"), ("USINT_u", "USINT"), ("BOOL_i", "BOOL"))
+
+# Cases of the differences accepted on fuzzed pages, see accepted()
+UNTERMINATED_TAG = "unterminated tag"
+MALFORMED_ATTRIBUTES = "malformed attributes"
+UNCLOSED_QUOTE = "unclosed quote"
+INVALID_REFERENCE = "invalid reference"
+DAMAGED_DOCUMENT = "damaged document"
+# Stands in for a register a decoded page lacks
+ABSENT = "absent"
+INPUT_OR_HIDDEN = re.compile(r"<INPUT\b|<!--|<!\[CDATA\[")
+HIDDEN_SECTION = re.compile(r"<!--.*?(?:-->|\Z)|<!\[CDATA\[.*?(?:\]\]>|\Z)", re.DOTALL)
+# Attributes as the XML parser of the reference reads them
+XML_ATTRIBUTE = re.compile(r"""\s+([^\s=/>"'<&\x00-\x1f]+)\s*=\s*(["'])""")
+XML_TAG_END = re.compile(r"\s*/?>")
+XML_REFERENCE = re.compile(r"&(#x[0-9A-Fa-f]+;|#[0-9]+;|#|[A-Za-z_:][\w.:-]*;?|)")
+XML_ENTITIES = {"amp;": "&", "lt;": "<", "gt;": ">", "quot;": '"', "apos;": "'"}
+# Tags and attributes as the decoders read them
+LENIENT_TAG = re.compile(r"""<INPUT\b((?:[^>"']|"[^"]*"|'[^']*')*)>""")
+LENIENT_ATTRIBUTE = re.compile(r"""([^\s=/>"']+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+VALUE_WHITESPACE = re.compile(r"\r\n|[\t\n\r]")
+VALUE_CONTROL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+@dataclass(frozen=True, slots=True)
+class CorpusPage:
+    """A page of the corpus."""
+
+    source: str
+    # Pages with the same key share a learned layout
+    key: str
+    body: bytes
+    charset: str | None = None
+    fuzzed: bool = False
+
+
+@dataclass
+class BackendResult:
+    """Conformance and throughput of a decoder."""
+
+    mismatches: int = 0
+    # Fuzzed pages with a difference accepted() does not explain
+    unexplained: int = 0
+    errors: int = 0
+    accepted: Counter[str] = field(default_factory=Counter)
+    pages_per_second: float = 0.0
+    examples: list[str] = field(default_factory=list)
+
+
+def recorded_pages(path: Path) -> list[CorpusPage]:
+    """Return the polled pages of a recorded session."""
+    return [
+        CorpusPage(
+            f"{path.name}#{index}", exchange.page, exchange.body, exchange.charset
+        )
+        for index, exchange in enumerate(read_recording(path))
+        if exchange.method == "get"
+        and exchange.page in POLL_PAGES
+        and exchange.status == 200  # noqa: PLR2004
+    ]
+
+
+def synthetic_pages(rng: random.Random) -> list[CorpusPage]:
+    """Return synthetic pages of several sizes."""
+    pages = []
+    for filler in (0, 16, 150, 1000):
+        names = register_names(filler)
+        pages.extend(
+            CorpusPage(f"synthetic-{filler}#{index}", f"synthetic-{filler}", body)
+            for index, body in enumerate(render_page(names, rng) for _ in range(5))
+        )
+    return pages
+
+
+def _edge_page(tags: list[str], encoding: str) -> bytes:
+    """Return a page with the given INPUT tags in an encoding."""
+    header = PAGE_HEADER.replace("windows-1250", encoding)
+    markup = "\n".join((header, *tags, PAGE_FOOTER))
+    return markup.encode(encoding, "xmlcharrefreplace")
+
+
+def edge_pages() -> list[CorpusPage]:
+    """Return hand written pages with the edge cases of the decoders."""
+    value_tags = [
+        f'<INPUT NAME="{register.format(number)}" VALUE="{value}">'
+        for number, (register, value) in enumerate(
+            itertools.product(EDGE_REGISTERS, EDGE_VALUES), start=1
+        )
+    ]
+    pages = [
+        CorpusPage(f"edge-values-{encoding}", f"edge-values-{encoding}", body)
+        for encoding in EDGE_ENCODINGS
+        for body in (_edge_page(value_tags, encoding),)
+    ]
+    pages.extend(
+        CorpusPage(f"edge-tag-{index}", f"edge-tag-{index}", _edge_page([tag], "utf-8"))
+        for index, tag in enumerate(EDGE_TAGS)
+    )
+    pages.append(CorpusPage("edge-empty", "edge-empty", _edge_page([], "utf-8")))
+    return pages
+
+
+def fuzzed_page(page: CorpusPage, rng: random.Random, index: int) -> CorpusPage:
+    """Return a randomly damaged variant of a page."""
+    body = bytearray(page.body)
+    tags = [
+        position for position in range(len(body)) if body.startswith(b"<", position)
+    ]
+    mutation = rng.choice(
+        ("truncate", "delete", "insert", "duplicate", "value", "swap", "case")
+    )
+    position = rng.randrange(len(body)) if body else 0
+
+    if mutation == "truncate":
+        del body[position:]
+    elif mutation == "delete":
+        del body[position : position + rng.randint(1, 8)]
+    elif mutation == "insert":
+        body[position:position] = rng.choice(
+            (b"<", b">", b'"', b"'", b"&", b"=", b" ", b"\x00", b"\xff", b"<INPUT ")
+        )
+    elif mutation == "duplicate" and tags:
+        start = rng.choice(tags)
+        end = body.find(b">", start) + 1 or len(body)
+        body[end:end] = body[start:end]
+    elif mutation == "value":
+        start = body.find(b'VALUE="', position)
+        if start >= 0:
+            end = body.find(b'"', start + 7)
+            value = rng.choice(EDGE_VALUES).encode("utf-8", "xmlcharrefreplace")
+            body[start + 7 : end] = value
+    elif mutation == "swap":
+        start = body.find(b"NAME=", position)
+        if start >= 0:
+            body[start : start + 5] = b"VALUE="[: 5 + rng.randint(0, 1)]
+    else:
+        start = rng.choice(tags) if tags else 0
+        body[start : start + 6] = body[start : start + 6].lower()
+
+    return CorpusPage(
+        f"{page.source}~{mutation}{index}",
+        page.key,
+        bytes(body),
+        page.charset,
+        fuzzed=True,
+    )
+
+
+def reference_map_response(str_response: str) -> Any:
+    """Map response."""
+    # Frozen copy of _map_response before the register catalog, keep as is
+    soup = BeautifulSoup(str_response, "lxml-xml")
+    results = {}
+
+    for elem in soup.find_all("INPUT"):
+        name = str(elem.get("NAME"))
+        value = str(elem.get("VALUE"))
+
+        if name is None or value is None:
+            continue
+
+        with contextlib.suppress(TypeError, ValueError):
+            if name.endswith("f"):
+                value = float(value) or 0
+
+            if name.endswith("USINT_u"):
+                value = int(value) or 0
+
+            if name.endswith("BOOL_i"):
+                value = bool(int(value)) or False
+
+        results[name] = value
+
+    return results
+
+
+def intended(name: str, raw: str, value: Any) -> Any:
+    """
+    Return a value of the reference with the intended differences applied.
+
+    The register catalog decodes registers by their type rather than by the
+    suffix rules of the reference:
+
+    - Registers of an integer type are decoded to int. The reference only
+      decoded USINT_u, it kept SINT_i, INT_i, UDINT_u and the others as
+      strings. None of the mapped registers has such a type.
+    - Integers out of the range of their type are kept as the raw string
+      and counted as invalid in the diagnostics. The reference decoded
+      USINT_u values of any size, which a register of one byte cannot hold.
+    - REAL, LREAL and BOOL registers are decoded whatever their format. The
+      reference looked at the last characters of the name, which only
+      differ for the damaged names of fuzzed pages.
+    - REAL and LREAL registers are rounded to the precision of their
+      format, one decimal for .1f. The device never sends more, so this
+      only changes the values of the edge cases.
+    - Real numbers stay float when they are zero. The reference turned 0.0
+      into the int 0, which is not a float to the checks of the schedules
+      and the equitherm curve.
+    """
+    match = TYPED_NAME.match(name)
+    type_ = match.group("type") if match is not None else None
+    precision = None
+    if type_ in REAL_TYPES:
+        float_format = FLOAT_FORMAT.match(match.group("format"))
+        precision = int(float_format.group("precision")) if float_format else None
+    elif type_ not in KNOWN_TYPES:
+        type_ = next(
+            (legacy for suffix, legacy in LEGACY_TYPES if name.endswith(suffix)), None
+        )
+
+    with contextlib.suppress(ValueError):
+        if type_ in REAL_TYPES:
+            number = float(raw)
+            return number if precision is None else round(number, precision)
+        if type_ == "BOOL":
+            return bool(int(raw)) or False
+        if type_ in INTEGER_RANGES:
+            minimum, maximum = INTEGER_RANGES[type_]
+            number = int(raw)
+            return number if minimum <= number <= maximum else raw
+    return value
+
+
+def expected_map_response(str_response: str) -> Any:
+    """Return what the reference returns with the intended differences applied."""
+    results = reference_map_response(str_response)
+    raw = {
+        str(elem.get("NAME")): str(elem.get("VALUE"))
+        for elem in BeautifulSoup(str_response, "lxml-xml").find_all("INPUT")
+    }
+    return {name: intended(name, raw[name], value) for name, value in results.items()}
+
+
+def _tag_starts(text: str) -> Iterator[int]:
+    """Yield the offsets of the INPUT tags outside comments and CDATA sections."""
+    end = 0
+    for match in INPUT_OR_HIDDEN.finditer(text):
+        if match.start() < end:
+            continue
+        if match.group() == "<INPUT":
+            yield match.start()
+        else:
+            end = HIDDEN_SECTION.match(text, match.start()).end()
+
+
+def _lenient_value(raw: str) -> str:
+    """Return an attribute value as the decoders decode it."""
+    return html.unescape(VALUE_CONTROL.sub("\ufffd", VALUE_WHITESPACE.sub(" ", raw)))
+
+
+def _xml_value(raw: str) -> str | None:
+    """Return an attribute value as the reference decodes it, None if dropped."""
+    raw = VALUE_CONTROL.sub("\ufffd", VALUE_WHITESPACE.sub(" ", raw))
+    parts = []
+    position = 0
+    for match in XML_REFERENCE.finditer(raw):
+        parts.append(raw[position : match.start()])
+        position = match.end()
+        reference = match.group(1)
+        # Unknown entities and stray ampersands are left out
+        if not reference.startswith("#"):
+            parts.append(XML_ENTITIES.get(reference, ""))
+            continue
+        # A broken character reference drops the attribute
+        if not reference.endswith(";"):
+            return None
+        code = (
+            int(reference[2:-1], 16)
+            if reference.startswith("#x")
+            else int(reference[1:-1])
+        )
+        if not 0 < code <= sys.maxunicode:
+            return None
+        parts.append(chr(code))
+    parts.append(raw[position:])
+    return "".join(parts)
+
+
+def reference_inputs(text: str) -> Iterator[tuple[int, int, str | None, str, str]]:
+    """
+    Yield the INPUT tags of a page as the reference recovers them.
+
+    Every tag comes with its start, the end of its attributes, its damage if
+    any, and its NAME and VALUE. The parser reads the attributes up to the
+    first one that is not well-formed and a value up to its closing quote,
+    even past the end of the tag.
+    """
+    end = 0
+    for start in _tag_starts(text):
+        # Tags in the unclosed quote of another tag are part of its value
+        if start < end:
+            continue
+        attributes = {}
+        damage = None
+        end = start + len("<INPUT")
+        while match := XML_ATTRIBUTE.match(text, end):
+            close = text.find(match.group(2), match.end())
+            # A quote that is never closed hides the rest of the page
+            if close < 0:
+                end = len(text)
+                if "<" in text[match.end() :]:
+                    damage = UNCLOSED_QUOTE
+                break
+            raw = text[match.end() : close]
+            value = _xml_value(raw)
+            if "<" in raw:
+                damage = UNCLOSED_QUOTE
+            elif value != _lenient_value(raw):
+                damage = damage or INVALID_REFERENCE
+            if value is not None:
+                attributes[match.group(1)] = value
+            end = close + 1
+
+        if damage is None and not XML_TAG_END.match(text, end):
+            damage = (
+                MALFORMED_ATTRIBUTES if text.find(">", end) >= 0 else UNTERMINATED_TAG
+            )
+        yield (
+            start,
+            end,
+            damage,
+            attributes.get("NAME", "None"),
+            attributes.get("VALUE", "None"),
+        )
+
+
+def decoder_inputs(text: str) -> Iterator[tuple[int, str, str]]:
+    """
+    Yield the INPUT tags of a page as the decoders read them.
+
+    Every tag comes with its start, and its NAME and VALUE. A tag runs to the
+    first ">" outside of quotes, one whose quotes do not balance is skipped.
+    Of the attributes, all well-formed ones are read, the last one counts.
+    """
+    end = 0
+    for start in _tag_starts(text):
+        if start < end:
+            continue
+        tag = LENIENT_TAG.match(text, start)
+        if tag is None:
+            continue
+        end = tag.end()
+        attributes = {
+            match.group(1): _lenient_value(
+                match.group(2) if match.group(2) is not None else match.group(3)
+            )
+            for match in LENIENT_ATTRIBUTE.finditer(tag.group(1))
+        }
+        yield start, attributes.get("NAME", "None"), attributes.get("VALUE", "None")
+
+
+def _damaged_document(text: str) -> bool:
+    """Return whether the markup around the INPUT tags is not well-formed."""
+    parts = []
+    position = 0
+    for start, end, *_ in reference_inputs(text):
+        parts.append(text[position:start])
+        # The rest of a malformed tag is kept, to fail the check
+        close = text.find(">", end)
+        position = end if close < 0 or "<" in text[end:close] else close + 1
+    parts.append(text[position:])
+    try:
+        ET.fromstring("".join(parts))  # noqa: S314 The corpus is generated here
+    except ET.ParseError:
+        return True
+    return False
+
+
+def accepted(
+    page: CorpusPage, want: Any, got: Any, catalog: AcondRegisterCatalog
+) -> Counter[str] | None:
+    """
+    Return the cases of the differences on a fuzzed page, None if unexplained.
+
+    The reference and the decoders recover damaged INPUT tags differently.
+    reference_inputs() and decoder_inputs() model both, a register differs
+    where the models do, and each side has to return what its model expects:
+
+    - Unterminated tag: the page ends in the tag. The reference keeps the
+      attributes completed before the end, the decoders skip the tag.
+    - Malformed attributes: an attribute without a name, an "=" or quotes,
+      or attributes not separated by space. The reference keeps the
+      attributes before it, "None" for the others, the decoders every
+      well-formed attribute of the tag.
+    - Unclosed quote: a value runs past the end of the tag. The reference
+      reads it up to the next quote and loses the tags in it, the decoders
+      skip the tag if its quotes do not balance.
+    - Invalid reference: an "&" that starts no valid reference. The
+      reference leaves out the "&" or the unknown entity, and drops the
+      attribute for a broken character reference, the decoders keep the
+      text as it is.
+    - Damaged document: the markup around the INPUT tags is not well-formed.
+      The reference loses tags there, a register is missing or comes from
+      another tag of the same name, the decoders return it as their model
+      expects.
+
+    A register that differs in any other way, or whose value is not the
+    expected one, is unexplained.
+    """
+    if not isinstance(want, dict) or not isinstance(got, dict):
+        return None
+
+    text = page_text(page)
+    # All tags of a name, the last one counts unless the reference loses it
+    reference: dict[str, list[tuple[int, str]]] = {}
+    damaged = []
+    for start, _, damage, name, value in reference_inputs(text):
+        reference.setdefault(name, []).append((start, value))
+        if damage is not None:
+            damaged.append((start, damage))
+    decoder = {name: (start, value) for start, name, value in decoder_inputs(text)}
+
+    cases: Counter[str] = Counter()
+    for name in want.keys() | got.keys():
+        want_value = want.get(name, ABSENT)
+        got_value = got.get(name, ABSENT)
+        if want_value == got_value:
+            continue
+
+        expected_want = [
+            _canonical(
+                expected_map_response(
+                    f"<PAGE><INPUT NAME={quoteattr(name)} VALUE={quoteattr(value)}/>"
+                    "</PAGE>"
+                )
+            )[name]
+            for _, value in reference.get(name, [])
+        ]
+        expected_got = ABSENT
+        if name in decoder:
+            expected_got = _canonical(
+                catalog.decode_inputs([(name, decoder[name][1])])
+            )[name]
+        if got_value != expected_got:
+            return None
+
+        if want_value == (expected_want[-1] if expected_want else ABSENT):
+            # The damaged tag the register comes from, or the one before it
+            # that swallowed or skipped it
+            position = max(
+                reference[name][-1][0] if name in reference else 0,
+                decoder[name][0] if name in decoder else 0,
+            )
+            damages = [damage for start, damage in damaged if start <= position]
+            if not damages:
+                return None
+            cases[damages[-1]] += 1
+        elif (
+            want_value == ABSENT or want_value in expected_want
+        ) and _damaged_document(text):
+            cases[DAMAGED_DOCUMENT] += 1
+        else:
+            return None
+
+    return cases
+
+
+def page_text(page: CorpusPage) -> str:
+    """Return a page decoded like the client decodes it."""
+    return page.body.decode(detect_encoding(page.body, page.charset), "replace")
+
+
+def _canonical(result: Any) -> Any:
+    """Return a decoded page with the value types spelled out, NaN included."""
+    if not isinstance(result, dict):
+        return (type(result).__name__, repr(result))
+    return {name: (type(value).__name__, repr(value)) for name, value in result.items()}
+
+
+def decoders() -> dict[str, Decoder]:
+    """Return the reference and the decoders checked against it."""
+    # The client decoder learns layouts and falls back like it does when polling
+    client = AcondApiClient("conformance", "", "", session=AcondReplaySession([]))
+    catalog = AcondRegisterCatalog()
+
+    def encoding(page: CorpusPage) -> str:
+        return detect_encoding(page.body, page.charset)
+
+    def decode_page(page: CorpusPage) -> Any:
+        client._page_encodings[page.key] = encoding(page)  # noqa: SLF001
+        return client._decode_page(page.key, page.body)  # noqa: SLF001
+
+    return {
+        REFERENCE: lambda page: reference_map_response(page_text(page)),
+        "AcondApiClient": lambda page: client._map_response(page_text(page)),  # noqa: SLF001
+        "extract_inputs": lambda page: catalog.decode_inputs(
+            extract_inputs(page.body, encoding(page))
+        ),
+        "_decode_page": decode_page,
+    }
+
+
+def check(
+    backends: dict[str, Decoder], corpus: list[CorpusPage]
+) -> dict[str, BackendResult]:
+    """Check every decoder against the reference and measure its throughput."""
+    expected = [_canonical(expected_map_response(page_text(page))) for page in corpus]
+    catalog = AcondRegisterCatalog()
+    results = {}
+
+    for name, decode in backends.items():
+        result = results[name] = BackendResult()
+        # The reference only lacks the intended differences
+        if name != REFERENCE:
+            _compare(decode, corpus, expected, result, catalog)
+
+        fastest = min(_measure(decode, corpus) for _ in range(THROUGHPUT_RUNS))
+        result.pages_per_second = len(corpus) / fastest
+
+    return results
+
+
+def _compare(
+    decode: Decoder,
+    corpus: list[CorpusPage],
+    expected: list[Any],
+    result: BackendResult,
+    catalog: AcondRegisterCatalog,
+) -> None:
+    """Count the pages a decoder does not decode as expected."""
+    for page, want in zip(corpus, expected, strict=True):
+        try:
+            got = _canonical(decode(page))
+        except Exception as exception:  # noqa: BLE001
+            result.errors += 1
+            got = ("error", repr(exception))
+        if got == want:
+            continue
+        if page.fuzzed:
+            cases = accepted(page, want, got, catalog)
+            if cases is not None:
+                result.accepted.update(cases)
+                continue
+            result.unexplained += 1
+        else:
+            result.mismatches += 1
+        result.examples.append(f"{page.source}: {_difference(want, got)}")
+
+
+def _difference(want: Any, got: Any) -> str:
+    """Describe the first difference between two decoded pages."""
+    if isinstance(want, dict) and isinstance(got, dict):
+        for name in sorted(want.keys() | got.keys()):
+            if want.get(name) != got.get(name):
+                return f"{name} expected {want.get(name)}, got {got.get(name)}"
+    return f"expected {want}, got {got}"
+
+
+def _measure(decode: Decoder, corpus: list[CorpusPage]) -> float:
+    """Return the time in seconds to decode the corpus once."""
+    start = time.perf_counter()
+    for page in corpus:
+        try:
+            decode(page)
+        except Exception:  # noqa: BLE001, S112
+            continue
+    return time.perf_counter() - start
+
+
+def gate(
+    results: dict[str, BackendResult],
+    baseline: dict[str, Any],
+    tolerance: float,
+) -> list[str]:
+    """Return the regressions of a run against a baseline."""
+    reference = results[REFERENCE].pages_per_second
+    failures = []
+    for name, result in results.items():
+        if name == REFERENCE:
+            continue
+        if result.mismatches or result.unexplained or result.errors:
+            failures.append(f"{name} does not match {REFERENCE}")
+
+        speedup = result.pages_per_second / reference
+        if name in FAST_PATHS and speedup < MIN_SPEEDUP:
+            failures.append(f"{name} is slower than {REFERENCE}")
+        previous = baseline.get("decoders", {}).get(name)
+        if previous is None:
+            continue
+
+        if speedup < previous["speedup"] * (1 - tolerance):
+            failures.append(
+                f"{name} is {speedup:.1f}x as fast as {REFERENCE}, "
+                f"the baseline {previous['speedup']:.1f}x"
+            )
+    return failures
+
+
+def main() -> None:
+    """Run the conformance suite."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recording", type=Path, action="append", default=[])
+    parser.add_argument("--fuzz", type=int, default=DEFAULT_FUZZ)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [
+        *(page for path in args.recording for page in recorded_pages(path)),
+        *synthetic_pages(rng),
+        *edge_pages(),
+    ]
+    corpus.extend(
+        fuzzed_page(rng.choice(corpus), rng, index) for index in range(args.fuzz)
+    )
+
+    results = check(decoders(), corpus)
+    reference = results[REFERENCE].pages_per_second
+    print(f"{len(corpus)} pages, {args.fuzz} of them fuzzed")
+    print(
+        f"{'decoder':<16} {'mismatch':>8} {'unexplained':>11} {'errors':>6} "
+        f"{'speedup':>8}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<16} {result.mismatches:>8} {result.unexplained:>11} "
+            f"{result.errors:>6} {result.pages_per_second / reference:>7.1f}x"
+        )
+        if result.accepted:
+            print(
+                "  accepted: "
+                + ", ".join(
+                    f"{case} {count}" for case, count in result.accepted.items()
+                )
+            )
+        for example in result.examples[:5]:
+            print(f"  {example}")
+
+    if args.save_baseline is not None:
+        args.save_baseline.write_text(
+            json.dumps(
+                {
+                    "decoders": {
+                        name: {
+                            "speedup": round(result.pages_per_second / reference, 2),
+                        }
+                        for name, result in results.items()
+                        if name != REFERENCE
+                    },
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if failures := gate(results, baseline, args.tolerance):
+        sys.exit("\n".join(failures))
+
+
+if __name__ == "__main__":
+    main()
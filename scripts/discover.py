@@ -0,0 +1,71 @@
+"""
+Scan a network for Acond Aconomis controllers.
+
+With --simulate N, N simulated controllers are started on 127.0.0.2 and up,
+all on the same port, and 127.0.0.0/24 is scanned on that port. Loopback
+hosts without a controller refuse the connection right away, on a LAN the
+scan takes longer as silent hosts run into the timeout.
+
+Usage: python3 scripts/discover.py [NETWORK] [--port PORT] [--simulate N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import standalone  # noqa: F401 Puts the aconomis package on the path
+from aconomis.discovery import (
+    DISCOVERY_PARALLELISM,
+    DISCOVERY_PORT,
+    DISCOVERY_TIMEOUT,
+    async_discover,
+)
+from simulator import start_simulators
+
+SIMULATED_NETWORK = "127.0.0.0/24"
+SIMULATED_PORT = 8480
+
+
+async def discover(args: argparse.Namespace) -> None:
+    """Scan the network and print the controllers found."""
+    runners = []
+    network, port = args.network, args.port
+    if args.simulate:
+        hosts = [f"127.0.0.{index + 2}" for index in range(args.simulate)]
+        network, port = SIMULATED_NETWORK, SIMULATED_PORT
+        runners, _, _ = await start_simulators(args.simulate, port=port, hosts=hosts)
+
+    start = time.perf_counter()
+    controllers = await async_discover(
+        network, port, timeout=args.timeout, parallelism=args.parallelism
+    )
+    elapsed = time.perf_counter() - start
+
+    for controller in controllers:
+        print(
+            f"{controller.host:<22} {controller.mac_address or '-':<18} "
+            f"{controller.software_version or '-'}"
+        )
+    print(f"Found {len(controllers)} controllers in {network} in {elapsed:.2f} s")
+
+    for runner in runners:
+        await runner.cleanup()
+
+
+def main() -> None:
+    """Run the scan."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("network", nargs="?", default=SIMULATED_NETWORK)
+    parser.add_argument("--port", type=int, default=DISCOVERY_PORT)
+    parser.add_argument("--timeout", type=float, default=DISCOVERY_TIMEOUT)
+    parser.add_argument("--parallelism", type=int, default=DISCOVERY_PARALLELISM)
+    parser.add_argument("--simulate", type=int, default=0)
+    args = parser.parse_args()
+
+    asyncio.run(discover(args))
+
+
+if __name__ == "__main__":
+    main()
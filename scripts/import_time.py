@@ -0,0 +1,145 @@
+"""
+Measure the import time of the integration against a budget.
+
+Imports every entry point Home Assistant loads, in a fresh interpreter with
+python -X importtime, after the Home Assistant modules it has loaded by then
+anyway. What remains is the import time the integration adds to startup.
+The client is also imported as the aconomis package, the way the scripts
+import it.
+Every entry point is measured several times and the fastest run counts.
+
+Exits with an error when an entry point exceeds its budget, e.g.
+--budget acond=20,acond.sensor=10 in milliseconds.
+
+Usage: python3 scripts/import_time.py [--runs N] [--budget MODULE=MS,...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+CUSTOM_COMPONENTS = Path(__file__).resolve().parent.parent / "custom_components"
+# The client package, imported on its own by the scripts
+LIBRARY = CUSTOM_COMPONENTS / "acond"
+
+# Loaded by Home Assistant before it imports the integration
+PRELOADED = (
+    "aiohttp",
+    "voluptuous",
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.entity_registry",
+    "homeassistant.helpers.update_coordinator",
+    # Dependencies of the integration, set up before it
+    "homeassistant.components.http",
+    "homeassistant.components.network",
+    "homeassistant.components.recorder",
+)
+
+# Entry points with the Home Assistant platform they belong to
+ENTRY_POINTS = {
+    "acond": None,
+    "acond.config_flow": None,
+    "acond.coordinator": None,
+    "acond.sensor": "homeassistant.components.sensor",
+    "acond.binary_sensor": "homeassistant.components.binary_sensor",
+    "acond.climate": "homeassistant.components.climate",
+    "acond.water_heater": "homeassistant.components.water_heater",
+    "acond.diagnostics": "homeassistant.components.diagnostics",
+    "aconomis.api": None,
+}
+
+# The package imports the client, coordinator, services and metrics
+DEFAULT_BUDGET = {"acond": 60.0}
+DEFAULT_BUDGET_OTHER = 25.0
+
+
+@dataclass
+class ImportTime:
+    """Import time of an entry point, in milliseconds."""
+
+    module: str
+    total: float
+    heaviest: list[tuple[str, float]]
+
+
+def measure(module: str, platform: str | None) -> ImportTime:
+    """Measure the import time of a module in a fresh interpreter."""
+    preload = "; ".join(f"import {name}" for name in (*PRELOADED, platform) if name)
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"{preload}; import {module}"],
+        env={
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join((str(CUSTOM_COMPONENTS), str(LIBRARY))),
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # Lines look like "import time:  self [us] | cumulative | imported package",
+    # the preloaded modules come first, everything after them is the module's
+    lines = result.stderr.splitlines()
+    start = next(
+        index
+        for index, line in reversed(list(enumerate(lines)))
+        if line.split("|")[-1].strip() in (*PRELOADED, platform)
+    )
+    own = []
+    for line in lines[start + 1 :]:
+        self_time, _, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        own.append((name, int(self_time) / 1000))
+
+    return ImportTime(
+        module=module,
+        total=sum(time for _, time in own),
+        heaviest=sorted(own, key=lambda item: item[1], reverse=True)[:5],
+    )
+
+
+def _parse_budget(value: str) -> dict[str, float]:
+    """Parse a budget of the form module=ms,module=ms."""
+    budget = {}
+    for item in value.split(","):
+        module, _, limit = item.partition("=")
+        if module not in ENTRY_POINTS:
+            msg = f"Unknown module {module}, expected one of {', '.join(ENTRY_POINTS)}"
+            raise argparse.ArgumentTypeError(msg)
+        budget[module] = float(limit)
+    return budget
+
+
+def main() -> None:
+    """Measure all entry points."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=_parse_budget, default={})
+    args = parser.parse_args()
+    budget = {**DEFAULT_BUDGET, **args.budget}
+
+    print(f"{'module':<22} {'ms':>7} {'budget':>7}  heaviest imports")
+    exceeded = []
+    for module, platform in ENTRY_POINTS.items():
+        result = min(
+            (measure(module, platform) for _ in range(args.runs)),
+            key=lambda result: result.total,
+        )
+        limit = budget.get(module, DEFAULT_BUDGET_OTHER)
+        heaviest = ", ".join(f"{name} {time:.1f}" for name, time in result.heaviest)
+        print(f"{module:<22} {result.total:>7.1f} {limit:>7.1f}  {heaviest}")
+        if result.total > limit:
+            exceeded.append(module)
+
+    if exceeded:
+        sys.exit(f"Import time budget exceeded by {', '.join(exceeded)}")
+
+
+if __name__ == "__main__":
+    main()
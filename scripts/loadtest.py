@@ -0,0 +1,234 @@
+"""
+Load test the Acond API client against many simulated controllers.
+
+Starts the simulated controllers in a separate process and polls every one
+of them from its own AcondApiClient in this event loop, at the interval the
+coordinator uses, staggered over the interval. Reports throughput, poll
+latency, event loop lag, CPU time per poll and peak memory growth for every
+device count, which gives a capacity curve.
+
+With --memory-budget, allocations are profiled per poll cycle and stage
+and the load test fails when a cycle exceeds the budget of a stage, e.g.
+--devices 1 --memory-budget parse=500000,merge=20000. Profile a single
+device for exact numbers.
+
+Usage: python3 scripts/loadtest.py [--devices 1,10,50] [--duration S]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import standalone  # noqa: F401 Puts the aconomis package on the path
+from aconomis.api import AcondApiClient, AcondApiClientError
+from aconomis.profiling import (
+    STAGES,
+    AcondMemoryBudgetExceededError,
+    AcondMemoryProfiler,
+)
+from aconomis.scheduler import DEFAULT_BURST, DEFAULT_RATE
+from simulator import start_simulators
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+
+# Same interval as the coordinator
+POLL_INTERVAL = 5.0
+LAG_PROBE_INTERVAL = 0.05
+
+
+@dataclass
+class LoadTestResult:
+    """Measurements of a single load test run."""
+
+    devices: int
+    duration: float
+    latencies: list[float] = field(default_factory=list)
+    lags: list[float] = field(default_factory=list)
+    errors: int = 0
+    budget_violations: int = 0
+    cpu_time: float = 0.0
+    memory_growth: int = 0
+
+    @staticmethod
+    def _percentile(values: list[float], percentile: float) -> float:
+        if not values:
+            return 0.0
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * percentile))]
+
+    def row(self) -> str:
+        """Return the result as a table row."""
+        polls = len(self.latencies)
+        return (
+            f"{self.devices:>7} {polls / self.duration:>8.2f} "
+            f"{statistics.median(self.latencies or [0]) * 1000:>8.1f} "
+            f"{self._percentile(self.latencies, 0.99) * 1000:>8.1f} "
+            f"{self._percentile(self.lags, 0.99) * 1000:>8.1f} "
+            f"{max(self.lags, default=0) * 1000:>8.1f} "
+            f"{self.cpu_time / max(polls, 1) * 1000:>8.2f} "
+            f"{self.memory_growth / 1024:>9.0f} "
+            f"{self.errors:>6}"
+        )
+
+
+HEADER = "devices  polls/s  p50 ms   p99 ms  lag p99  lag max  cpu ms  mem KiB  errors"
+
+
+def run_simulators(count: int, latency: float, connection: Connection) -> None:
+    """Run simulated controllers until the connection is closed."""
+
+    async def serve() -> None:
+        runners, addresses, _ = await start_simulators(count, latency=latency)
+        connection.send(addresses)
+        await asyncio.get_running_loop().run_in_executor(None, connection.recv)
+        for runner in runners:
+            await runner.cleanup()
+
+    asyncio.run(serve())
+
+
+async def _probe_lag(result: LoadTestResult, stop: asyncio.Event) -> None:
+    """Measure how late the event loop wakes up a sleeping task."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        result.lags.append(time.perf_counter() - start - LAG_PROBE_INTERVAL)
+
+
+async def _poll(
+    client: AcondApiClient,
+    offset: float,
+    deadline: float,
+    result: LoadTestResult,
+) -> None:
+    """Poll a device at the coordinator interval until the deadline."""
+    await asyncio.sleep(offset)
+    while (start := time.perf_counter()) < deadline:
+        try:
+            await client.async_get_all()
+        except AcondApiClientError:
+            result.errors += 1
+        else:
+            result.latencies.append(time.perf_counter() - start)
+
+        if (profiler := client.memory_profiler) is not None:
+            try:
+                profiler.check(profiler.end_cycle())
+            except AcondMemoryBudgetExceededError as exception:
+                result.budget_violations += 1
+                print(f"Memory budget exceeded: {exception}")
+        await asyncio.sleep(max(0.0, POLL_INTERVAL - (time.perf_counter() - start)))
+
+
+def _peak_memory() -> int:
+    """Return the peak resident memory of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+async def load_test(
+    addresses: list[str], duration: float, budget: dict[str, int] | None
+) -> LoadTestResult:
+    """Poll all devices for the duration."""
+    result = LoadTestResult(devices=len(addresses), duration=duration)
+    clients = [
+        # The stand-ins accept any credentials
+        AcondApiClient(ip_address=address, username="user", password="pass")  # noqa: S106
+        for address in addresses
+    ]
+
+    # Warm up the sessions, page layouts and register catalogs first
+    await asyncio.gather(*(client.async_get_all() for client in clients))
+    # and let the rate limits recover from it
+    await asyncio.sleep(DEFAULT_BURST / DEFAULT_RATE)
+
+    if budget is not None:
+        for client in clients:
+            client.memory_profiler = AcondMemoryProfiler(budget)
+            client.memory_profiler.start()
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe_lag(result, stop))
+    memory = _peak_memory()
+    cpu = time.process_time()
+    deadline = time.perf_counter() + duration
+
+    await asyncio.gather(
+        *(
+            _poll(client, POLL_INTERVAL * index / len(clients), deadline, result)
+            for index, client in enumerate(clients)
+        )
+    )
+
+    result.cpu_time = time.process_time() - cpu
+    result.memory_growth = _peak_memory() - memory
+    stop.set()
+    await probe
+
+    for client in clients:
+        if client.memory_profiler is not None:
+            client.memory_profiler.stop()
+        await client.close()
+
+    return result
+
+
+def _parse_budget(value: str) -> dict[str, int]:
+    """Parse a memory budget of the form stage=bytes,stage=bytes."""
+    budget = {}
+    for item in value.split(","):
+        stage, _, limit = item.partition("=")
+        if stage not in STAGES:
+            msg = f"Unknown stage {stage}, expected one of {', '.join(STAGES)}"
+            raise argparse.ArgumentTypeError(msg)
+        budget[stage] = int(limit)
+    return budget
+
+
+def main() -> None:
+    """Run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", default="1,10,50")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--memory-budget", type=_parse_budget)
+    args = parser.parse_args()
+
+    counts = [int(count) for count in args.devices.split(",")]
+    # Every client keeps connections open to its controller
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, 4096)), hard))
+
+    print(HEADER)
+    violations = 0
+    for count in counts:
+        connection, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=run_simulators, args=(count, args.latency, child), daemon=True
+        )
+        process.start()
+        addresses = connection.recv()
+
+        result = asyncio.run(load_test(addresses, args.duration, args.memory_budget))
+        print(result.row())
+        violations += result.budget_violations
+
+        connection.send(None)
+        process.join()
+
+    if violations:
+        sys.exit(f"{violations} poll cycles exceeded the memory budget")
+
+
+if __name__ == "__main__":
+    main()
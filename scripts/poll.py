@@ -0,0 +1,191 @@
+"""
+Poll Acond Aconomis controllers outside of Home Assistant.
+
+Polls every device concurrently with its own AcondApiClient and writes a
+JSON line per poll with the decoded snapshot, keyed like the register
+mapping of the integration, to stdout or a file. Only the aconomis client
+package of the integration is used, which needs aiohttp, and BeautifulSoup
+for pages the byte-level parser cannot handle.
+
+With --interval 0 devices are polled back to back, which together with
+the timing summary makes this a benchmarking driver against real or
+simulated controllers. Requests are rate limited per device like in the
+integration, raise --rate when benchmarking simulated controllers.
+Request timeouts are learned from the latency of every page, within
+--timeout-floor and --timeout-ceiling.
+
+Usage: python3 scripts/poll.py HOST [HOST ...] [--once] [--interval S]
+           [--polls N] [--rate N] [--timeout-floor S] [--timeout-ceiling S]
+           [--output FILE] [--raw] [--summary]
+
+Credentials are read from --username and --password, or from the
+ACOND_USERNAME and ACOND_PASSWORD environment variables.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from contextlib import nullcontext, suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+import standalone  # noqa: F401 Puts the aconomis package on the path
+from aconomis.api import AcondApiClient, AcondApiClientError
+from aconomis.const import ACOND_ACONOMIS_DATA_MAPPINGS
+from aconomis.latency import (
+    DEFAULT_TIMEOUT_CEILING,
+    DEFAULT_TIMEOUT_FLOOR,
+    AcondLatencyEstimator,
+)
+from aconomis.scheduler import DEFAULT_BURST, DEFAULT_RATE, AcondRequestScheduler
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+DEFAULT_INTERVAL = 5.0
+
+
+@dataclass
+class DeviceTimings:
+    """Poll timings of a single device."""
+
+    host: str
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def row(self, client: AcondApiClient) -> str:
+        """Return the timings as a table row."""
+        latencies = sorted(self.latencies) or [0.0]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        parse = sum(
+            stats.loop_time + stats.executor_time
+            for stats in client.parse_stats.values()
+        )
+        return (
+            f"{self.host:<22} {len(self.latencies):>6} {self.errors:>6} "
+            f"{statistics.median(latencies) * 1000:>8.1f} "
+            f"{p99 * 1000:>8.1f} "
+            f"{parse / max(len(self.latencies), 1) * 1000:>8.2f}"
+        )
+
+
+SUMMARY_HEADER = "host                    polls errors   p50 ms   p99 ms parse ms"
+
+
+def snapshot(host: str, data: dict[str, Any], *, raw: bool) -> str:
+    """Return a poll result as a JSON line."""
+    if raw:
+        registers = data
+    else:
+        registers = {
+            key.lower(): data[register]
+            for key, register in ACOND_ACONOMIS_DATA_MAPPINGS.items()
+            if register in data
+        }
+    return json.dumps(
+        {"time": round(time.time(), 3), "host": host, "data": registers},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+async def poll_device(
+    client: AcondApiClient,
+    timings: DeviceTimings,
+    output: IO[str],
+    offset: float,
+    args: argparse.Namespace,
+) -> None:
+    """Poll a device at the interval until it has been polled often enough."""
+    await asyncio.sleep(offset)
+    polls = 1 if args.once else args.polls
+    count = 0
+    while polls is None or count < polls:
+        count += 1
+        start = time.perf_counter()
+        try:
+            data = await client.async_get_all()
+        except AcondApiClientError as exception:
+            timings.errors += 1
+            print(f"{timings.host}: {exception}", file=sys.stderr)
+        else:
+            timings.latencies.append(time.perf_counter() - start)
+            output.write(snapshot(timings.host, data, raw=args.raw) + "\n")
+            output.flush()
+
+        if polls is None or count < polls:
+            elapsed = time.perf_counter() - start
+            await asyncio.sleep(max(0.0, args.interval - elapsed))
+
+
+async def poll(hosts: Sequence[str], args: argparse.Namespace, output: IO[str]) -> None:
+    """Poll all devices concurrently, staggered over the interval."""
+    clients = [
+        AcondApiClient(
+            ip_address=host,
+            username=args.username,
+            password=args.password,
+            scheduler=AcondRequestScheduler(args.rate, DEFAULT_BURST),
+            latency=AcondLatencyEstimator(args.timeout_floor, args.timeout_ceiling),
+        )
+        for host in hosts
+    ]
+    timings = [DeviceTimings(host) for host in hosts]
+    try:
+        await asyncio.gather(
+            *(
+                poll_device(
+                    client, device, output, args.interval * index / len(hosts), args
+                )
+                for index, (client, device) in enumerate(
+                    zip(clients, timings, strict=True)
+                )
+            )
+        )
+    finally:
+        if args.summary:
+            print(SUMMARY_HEADER, file=sys.stderr)
+            for client, device in zip(clients, timings, strict=True):
+                print(device.row(client), file=sys.stderr)
+        for client in clients:
+            await client.close()
+
+
+def main() -> None:
+    """Run the poller."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("hosts", nargs="+")
+    parser.add_argument("--username", default=os.environ.get("ACOND_USERNAME", ""))
+    parser.add_argument("--password", default=os.environ.get("ACOND_PASSWORD", ""))
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE)
+    parser.add_argument("--polls", type=int)
+    parser.add_argument("--timeout-floor", type=float, default=DEFAULT_TIMEOUT_FLOOR)
+    parser.add_argument(
+        "--timeout-ceiling", type=float, default=DEFAULT_TIMEOUT_CEILING
+    )
+    parser.add_argument("--once", action="store_true")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--raw", action="store_true")
+    parser.add_argument("--summary", action="store_true")
+    args = parser.parse_args()
+
+    context = (
+        args.output.open("a", encoding="utf-8")
+        if args.output is not None
+        else nullcontext(sys.stdout)
+    )
+    # Interrupting stops polling, the summary is still printed
+    with context as output, suppress(KeyboardInterrupt):
+        asyncio.run(poll(args.hosts, args, output))
+
+
+if __name__ == "__main__":
+    main()
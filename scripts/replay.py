@@ -0,0 +1,84 @@
+"""
+Replay a recorded Acond session through the API client.
+
+Feeds a recording made with the acond.start_recording service back through
+AcondApiClient.async_get_all, the way the coordinator polls, at the
+recorded cadence divided by the speed.
+
+Usage: python3 scripts/replay.py RECORDING [--speed N] [--polls N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+from pathlib import Path
+
+import standalone  # noqa: F401 Puts the aconomis package on the path
+from aconomis.api import PAGE_MEASUREMENT, AcondApiClient
+from aconomis.recording import AcondReplaySession, read_recording
+from aconomis.scheduler import DEFAULT_BURST, DEFAULT_RATE, AcondRequestScheduler
+
+# Poll interval used when the recording does not contain two polls
+DEFAULT_INTERVAL = 5.0
+
+
+async def replay(path: Path, speed: float, polls: int) -> None:
+    """Replay a recording and report the poll latencies."""
+    exchanges = read_recording(path)
+    starts = [
+        exchange.time
+        for exchange in exchanges
+        if exchange.method == "get" and exchange.page == PAGE_MEASUREMENT
+    ]
+    intervals = [b - a for a, b in itertools.pairwise(starts)] or [DEFAULT_INTERVAL]
+
+    # Scale the rate limit along with the replay speed
+    scale = speed if speed > 0 else 1000.0
+    client = AcondApiClient(
+        ip_address="replay",
+        username="",
+        password="",
+        session=AcondReplaySession(exchanges, speed),
+        scheduler=AcondRequestScheduler(DEFAULT_RATE * scale, DEFAULT_BURST),
+    )
+
+    latencies = []
+    try:
+        for poll in range(polls):
+            start = time.perf_counter()
+            data = await client.async_get_all()
+            latency = time.perf_counter() - start
+            latencies.append(latency)
+            print(f"poll {poll}: {len(data)} registers in {latency * 1000:.1f} ms")
+
+            if speed > 0:
+                interval = intervals[poll % len(intervals)] / speed
+                await asyncio.sleep(max(0.0, interval - latency))
+    finally:
+        await client.close()
+
+    latencies.sort()
+    print(
+        f"{len(latencies)} polls, "
+        f"p50 {statistics.median(latencies) * 1000:.1f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms"
+    )
+
+
+def main() -> None:
+    """Run the replay."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("recording", type=Path)
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--polls", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(replay(args.recording, args.speed, args.polls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Synthetic Acond Aconomis pages for benchmarks and local stand-ins."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from aconomis.const import ACOND_ACONOMIS_DATA_MAPPINGS
+
+if TYPE_CHECKING:
+    import random
+
+PAGE_HEADER = '<?xml version="1.0" encoding="windows-1250"?>\n<PAGE>\n'
+PAGE_FOOTER = "</PAGE>\n"
+
+# Real pages carry many more registers than the integration maps
+FILLER_REGISTERS = 150
+
+
+def register_value(name: str, rng: random.Random) -> str:
+    """Return a plausible raw value for a register."""
+    if name.endswith("BOOL_i"):
+        return str(rng.randint(0, 1))
+    if name.endswith("USINT_u"):
+        return str(rng.choice((0, 1, 3, 4, 6)))
+    if name.endswith("f"):
+        precision = int(name[-2]) if name[-2].isdigit() else 1
+        return f"{rng.uniform(-20, 60):.{precision}f}"
+    if "MAC" in name or name.endswith("STRING[17]_s"):
+        return "00:11:22:33:44:55"
+    if name.endswith("_s"):
+        length = int(name[name.index("[") + 1 : name.index("]")]) if "[" in name else 80
+        return rng.choice(("EQUITHERM", "MANUALLY", "Aconomis 2.4.1"))[:length]
+    return str(rng.randint(0, 100))
+
+
+def register_names(filler: int = FILLER_REGISTERS) -> list[str]:
+    """Return the register names of a synthetic page."""
+    names = sorted(set(ACOND_ACONOMIS_DATA_MAPPINGS.values()))
+    suffixes = ("REAL_.1f", "REAL_.2f", "BOOL_i", "USINT_u", "INT_i", "STRING[20]_s")
+    names.extend(
+        f"__T{index:08X}_{suffixes[index % len(suffixes)]}" for index in range(filler)
+    )
+    return names
+
+
+def render_page(
+    names: list[str], rng: random.Random, values: dict[str, str] | None = None
+) -> bytes:
+    """Render a page with the given registers."""
+    values = values or {}
+    lines = [PAGE_HEADER]
+    for name in names:
+        value = values.get(name) or register_value(name, rng)
+        lines.append(f'<INPUT NAME="{name}" VALUE="{value}"/>\n')
+    lines.append(PAGE_FOOTER)
+    return "".join(lines).encode("cp1250")
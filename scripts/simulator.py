@@ -0,0 +1,218 @@
+"""
+Local stand-ins for Acond Aconomis controllers.
+
+Every simulated controller serves the login page and the polled pages with
+synthetic registers that drift between requests, and accepts writes.
+
+Usage: python3 scripts/simulator.py [--count N] [--host HOST] [--port PORT]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import secrets
+import socket
+
+import standalone  # noqa: F401 Puts the aconomis package on the path
+from aconomis.api import (
+    PAGE_CONTROL,
+    PAGE_EQUITHERM,
+    PAGE_LOGIN,
+    PAGE_MEASUREMENT,
+    PAGE_SETTINGS,
+)
+from aconomis.const import ACOND_ACONOMIS_DATA_MAPPINGS
+from aiohttp import web
+from sample_pages import FILLER_REGISTERS, register_names, register_value, render_page
+
+SESSION_COOKIE = "SESSION"
+
+PAGE_KEYS = {
+    PAGE_SETTINGS: ("MAC_ADDRESS", "SOFTWARE_VERSION"),
+    PAGE_CONTROL: (
+        "REGULATION_MODE",
+        "OPERATING_MODE",
+        "SEASON_MODE",
+        "MANUAL_TARGET_RETURN_WATER_TEMPERATURE",
+        "MANUAL_TARGET_RETURN_WATER_COOLING_TEMPERATURE",
+        "DHW_TEMPERATURE_REQUIRED",
+        "SET_DHW_TEMPERATURE_REQUIRED",
+    ),
+    PAGE_EQUITHERM: ("EQUITHERM_TARGET_RETURN_WATER_TEMPERATURE",),
+}
+
+
+class SimulatedController:
+    """A single simulated controller."""
+
+    def __init__(
+        self, seed: int, latency: float = 0.0, filler: int = FILLER_REGISTERS
+    ) -> None:
+        """Initialize the controller."""
+        self.rng = random.Random(seed)
+        self.latency = latency
+        self.sessions: set[str] = set()
+        self.requests = 0
+        self.values = {
+            name: register_value(name, self.rng) for name in register_names(0)
+        }
+        self.values[ACOND_ACONOMIS_DATA_MAPPINGS["REGULATION_MODE"]] = "EQUITHERM"
+        self.values[ACOND_ACONOMIS_DATA_MAPPINGS["MAC_ADDRESS"]] = ":".join(
+            f"{self.rng.randrange(256):02X}" for _ in range(6)
+        )
+        self.values[ACOND_ACONOMIS_DATA_MAPPINGS["SOFTWARE_VERSION"]] = "Aconomis 2.4"
+
+        # Registers not listed in PAGE_KEYS are measurements
+        assigned = {
+            ACOND_ACONOMIS_DATA_MAPPINGS[key]: page
+            for page, keys in PAGE_KEYS.items()
+            for key in keys
+        }
+        fillers = register_names(filler)[len(self.values) :]
+        self.pages: dict[str, list[str]] = {
+            page: [name for name in self.values if assigned.get(name) == page]
+            for page in PAGE_KEYS
+        }
+        self.pages[PAGE_MEASUREMENT] = [
+            name for name in self.values if name not in assigned
+        ]
+        for index, name in enumerate(fillers):
+            self.pages[(*self.pages,)[index % len(self.pages)]].append(name)
+
+    def drift(self) -> None:
+        """Let the measurements drift."""
+        for name in self.pages[PAGE_MEASUREMENT]:
+            if name.endswith("f") and self.rng.random() < 0.3:  # noqa: PLR2004
+                self.values[name] = register_value(name, self.rng)
+            elif name.endswith("BOOL_i") and self.rng.random() < 0.02:  # noqa: PLR2004
+                self.values[name] = str(1 - int(self.values.get(name, "0")))
+
+    async def handle_login(self, request: web.Request) -> web.Response:
+        """Accept any credentials."""
+        await self._respond()
+        await request.post()
+        session = secrets.token_hex(8)
+        self.sessions.add(session)
+        response = web.Response(status=302, headers={"Location": "/"})
+        response.set_cookie(SESSION_COOKIE, session)
+        return response
+
+    async def handle_page(self, request: web.Request) -> web.Response:
+        """Serve a page, or redirect to the login page without a session."""
+        await self._respond()
+        page = request.match_info["page"]
+        if page not in self.pages:
+            raise web.HTTPNotFound
+        if request.cookies.get(SESSION_COOKIE) not in self.sessions:
+            return web.Response(status=302, headers={"Location": f"/{PAGE_LOGIN}"})
+
+        if page == PAGE_MEASUREMENT:
+            self.drift()
+        body = render_page(self.pages[page], self.rng, self.values)
+        return web.Response(body=body, content_type="text/xml", charset="windows-1250")
+
+    async def handle_write(self, request: web.Request) -> web.Response:
+        """Accept writes of the form NAME=VALUE."""
+        await self._respond()
+        if request.cookies.get(SESSION_COOKIE) not in self.sessions:
+            return web.Response(status=302, headers={"Location": f"/{PAGE_LOGIN}"})
+
+        for field in (await request.post()).keys():  # noqa: SIM118
+            name, _, value = field.partition("=")
+            if name in self.values:
+                self.values[name] = value
+        return web.Response(text="OK")
+
+    async def handle_login_page(self, request: web.Request) -> web.Response:  # noqa: ARG002
+        """Serve the login form, which also identifies the controller."""
+        await self._respond()
+        names = [
+            ACOND_ACONOMIS_DATA_MAPPINGS["MAC_ADDRESS"],
+            ACOND_ACONOMIS_DATA_MAPPINGS["SOFTWARE_VERSION"],
+        ]
+        body = render_page(names, self.rng, self.values).replace(
+            b"<PAGE>\n",
+            b'<PAGE>\n<INPUT NAME="USER" VALUE=""/>\n<INPUT NAME="PASS" VALUE=""/>\n',
+        )
+        return web.Response(body=body, content_type="text/xml", charset="windows-1250")
+
+    async def _respond(self) -> None:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.latency)
+
+    def build_app(self) -> web.Application:
+        """Build the web application of the controller."""
+        app = web.Application()
+        app.router.add_post(f"/{PAGE_LOGIN}", self.handle_login)
+        app.router.add_get(f"/{PAGE_LOGIN}", self.handle_login_page)
+        app.router.add_get("/{page}", self.handle_page)
+        app.router.add_post("/{page}", self.handle_write)
+        return app
+
+
+async def start_simulators(
+    count: int,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: float = 0.0,
+    hosts: list[str] | None = None,
+) -> tuple[list[web.AppRunner], list[str], list[SimulatedController]]:
+    """
+    Start simulated controllers and return their addresses.
+
+    Controllers listen on consecutive ports from the given port, or on any
+    free port if it is 0. With a list of hosts, every controller listens on
+    its own host and the same port instead.
+    """
+    runners, addresses, controllers = [], [], []
+
+    for index in range(count):
+        controller = SimulatedController(seed=index, latency=latency)
+        runner = web.AppRunner(controller.build_app(), access_log=None)
+        await runner.setup()
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hosts:
+            sock.bind((hosts[index], port))
+        else:
+            sock.bind((host, port + index if port else 0))
+        await web.SockSite(runner, sock).start()
+
+        runners.append(runner)
+        addresses.append("{}:{}".format(*sock.getsockname()))
+        controllers.append(controller)
+
+    return runners, addresses, controllers
+
+
+async def serve(count: int, host: str, port: int, latency: float) -> None:
+    """Serve simulated controllers until interrupted."""
+    runners, addresses, _ = await start_simulators(count, host, port, latency)
+    for address in addresses:
+        print(f"Simulated controller at http://{address}/")
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+
+def main() -> None:
+    """Run the simulators."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.count, args.host, args.port, args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Make the aconomis client package of the integration importable.
+
+The client, parser, scheduler and the other modules the scripts use live
+in the aconomis package inside the integration, which does not import
+Home Assistant. Importing this module puts the directory containing it on
+the path, after which the package is imported as usual.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+LIBRARY = Path(__file__).resolve().parent.parent / "custom_components" / "acond"
+
+if str(LIBRARY) not in sys.path:
+    sys.path.insert(0, str(LIBRARY))